@@ -8,30 +8,87 @@ The key insight: Gemini extracts everything, OpenAI summarizes what to DO.
 """
 
 import asyncio
-import json
+import hashlib
+import logging
 import os
+import random
 import time
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
 
 import httpx
+import orjson
 from prompts import (
     get_section_combine_prompt,
     get_section_extract_prompt,
     get_summarize_prompt,
 )
 
+# Child of main.py's "spec_analyzer" logger, which owns the queued handler
+logger = logging.getLogger("spec_analyzer.analyzer")
+
 # API Configuration
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-3-flash-preview:generateContent"
+GEMINI_STREAM_URL = GEMINI_API_URL.replace(":generateContent", ":streamGenerateContent")
 OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
+OPENAI_MODEL = "gpt-4o-mini"
 
-# Retry configuration
-MAX_RETRIES = 3
-RETRY_BACKOFF_SECONDS = [2, 5, 10]  # Wait times between retries
+# Retry configuration - exponential backoff with jitter, capped; a Retry-After
+# header from the API takes precedence
+MAX_RETRIES = 5
+RETRY_BASE_SECONDS = 2
+RETRY_MAX_SECONDS = 60
 RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
 
+# Process-wide cap on in-flight Gemini requests, so concurrent analyses queue
+# here instead of bursting into the API's rate limit
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+_gemini_semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+# Shared HTTP client for Gemini/OpenAI calls and main.py's auth checks
+# (created lazily, closed on shutdown)
+HTTP_MAX_CONNECTIONS = 32
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared AsyncClient so API calls reuse pooled HTTP/2 connections
+    instead of paying a TCP+TLS handshake per request.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=120.0,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared AsyncClient (called on app shutdown)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def retry_wait_seconds(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry `attempt` (0-based); honors Retry-After"""
+    if retry_after:
+        try:
+            return min(float(retry_after), RETRY_MAX_SECONDS)
+        except ValueError:
+            pass  # HTTP-date form - fall back to exponential backoff
+    backoff = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**attempt)
+    return round(backoff * random.uniform(0.5, 1.0), 1)
+
 
 async def gemini_request_with_retry(
     payload: dict,
@@ -40,45 +97,138 @@ async def gemini_request_with_retry(
 ) -> dict:
     """
     Make a Gemini API request with automatic retry on transient failures.
-    Retries on 429, 500, 502, 503, 504 with exponential backoff.
+    Retries on 429, 500, 502, 503, 504 and timeouts with exponential backoff.
+    In-flight requests are capped by GEMINI_MAX_CONCURRENCY (backoff waits
+    don't hold a slot).
     Raises Exception on permanent failure after all retries exhausted.
     """
     last_error = None
 
     for attempt in range(MAX_RETRIES + 1):
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
+            async with _gemini_semaphore:
+                response = await get_http_client().post(
                     f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
                     json=payload,
+                    timeout=timeout,
+                )
+
+            if response.status_code == 200:
+                return response.json()
+
+            # Check if retryable
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < MAX_RETRIES:
+                wait_time = retry_wait_seconds(
+                    attempt, response.headers.get("retry-after")
+                )
+                logger.warning(
+                    "[%s] API returned %s, retrying in %ss (attempt %s/%s)...",
+                    label,
+                    response.status_code,
+                    wait_time,
+                    attempt + 1,
+                    MAX_RETRIES,
+                )
+                await asyncio.sleep(wait_time)
+                last_error = f"HTTP {response.status_code}: {response.text[:200]}"
+                continue
+
+            # Non-retryable error or retries exhausted
+            raise Exception(
+                f"{label} API error: {response.status_code} - {response.text[:500]}"
+            )
+
+        except httpx.TimeoutException:
+            if attempt < MAX_RETRIES:
+                wait_time = retry_wait_seconds(attempt)
+                logger.warning(
+                    "[%s] Request timed out, retrying in %ss (attempt %s/%s)...",
+                    label,
+                    wait_time,
+                    attempt + 1,
+                    MAX_RETRIES,
                 )
+                await asyncio.sleep(wait_time)
+                last_error = "Request timed out"
+                continue
+            raise Exception(f"{label} timed out after {MAX_RETRIES + 1} attempts")
+
+    raise Exception(
+        f"{label} failed after {MAX_RETRIES + 1} attempts. Last error: {last_error}"
+    )
+
+
+async def gemini_stream_text(
+    payload: dict,
+    timeout: float = 120.0,
+    label: str = "Gemini",
+) -> AsyncIterator[str]:
+    """
+    Stream a Gemini response (streamGenerateContent over SSE), yielding text
+    as it is generated. Transient failures are retried like
+    gemini_request_with_retry, but only until the first text arrives - after
+    that a failure raises rather than replaying text already yielded.
+    """
+    last_error = None
+    started = False
 
-                if response.status_code == 200:
-                    return response.json()
-
-                # Check if retryable
-                if (
-                    response.status_code in RETRYABLE_STATUS_CODES
-                    and attempt < MAX_RETRIES
-                ):
-                    wait_time = RETRY_BACKOFF_SECONDS[attempt]
-                    print(
-                        f"[{label}] API returned {response.status_code}, retrying in {wait_time}s (attempt {attempt + 1}/{MAX_RETRIES})..."
-                    )
-                    await asyncio.sleep(wait_time)
-                    last_error = f"HTTP {response.status_code}: {response.text[:200]}"
-                    continue
-
-                # Non-retryable error or retries exhausted
-                raise Exception(
-                    f"{label} API error: {response.status_code} - {response.text[:500]}"
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with _gemini_semaphore:
+                async with get_http_client().stream(
+                    "POST",
+                    f"{GEMINI_STREAM_URL}?alt=sse&key={GEMINI_API_KEY}",
+                    json=payload,
+                    timeout=timeout,
+                ) as response:
+                    if response.status_code == 200:
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            chunk = orjson.loads(line[5:])
+                            parts = (
+                                chunk.get("candidates", [{}])[0]
+                                .get("content", {})
+                                .get("parts", [])
+                            )
+                            text = "".join(part.get("text", "") for part in parts)
+                            if text:
+                                started = True
+                                yield text
+                        return
+                    await response.aread()
+
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < MAX_RETRIES:
+                wait_time = retry_wait_seconds(
+                    attempt, response.headers.get("retry-after")
+                )
+                logger.warning(
+                    "[%s] API returned %s, retrying in %ss (attempt %s/%s)...",
+                    label,
+                    response.status_code,
+                    wait_time,
+                    attempt + 1,
+                    MAX_RETRIES,
                 )
+                await asyncio.sleep(wait_time)
+                last_error = f"HTTP {response.status_code}: {response.text[:200]}"
+                continue
+
+            raise Exception(
+                f"{label} API error: {response.status_code} - {response.text[:500]}"
+            )
 
         except httpx.TimeoutException:
+            if started:
+                raise Exception(f"{label} stream timed out mid-response")
             if attempt < MAX_RETRIES:
-                wait_time = RETRY_BACKOFF_SECONDS[attempt]
-                print(
-                    f"[{label}] Request timed out, retrying in {wait_time}s (attempt {attempt + 1}/{MAX_RETRIES})..."
+                wait_time = retry_wait_seconds(attempt)
+                logger.warning(
+                    "[%s] Request timed out, retrying in %ss (attempt %s/%s)...",
+                    label,
+                    wait_time,
+                    attempt + 1,
+                    MAX_RETRIES,
                 )
                 await asyncio.sleep(wait_time)
                 last_error = "Request timed out"
@@ -90,6 +240,143 @@ async def gemini_request_with_retry(
     )
 
 
+def extract_json(text: str) -> Any:
+    """
+    Parse a JSON value out of a model response.
+    Tries the whole text first, then each balanced [...] / {...} block in turn
+    (bracket-depth scan that ignores brackets inside string literals), so code
+    fences or surrounding prose don't discard an otherwise valid response.
+    Raises orjson.JSONDecodeError if nothing parses.
+    """
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
+
+    start = next((i for i, ch in enumerate(text) if ch in "[{"), -1)
+    while start != -1:
+        depth = 0
+        in_string = False
+        escaped = False
+        end = -1
+        for i in range(start, len(text)):
+            ch = text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch in "[{":
+                depth += 1
+            elif ch in "]}":
+                depth -= 1
+                if depth == 0:
+                    end = i
+                    break
+
+        if end == -1:
+            break
+        try:
+            return orjson.loads(text[start : end + 1])
+        except orjson.JSONDecodeError:
+            start = next(
+                (i for i in range(start + 1, len(text)) if text[i] in "[{"), -1
+            )
+
+    raise orjson.JSONDecodeError("No JSON value found in response", text, 0)
+
+
+class JsonArrayItemParser:
+    """
+    Incremental parser for a JSON array arriving in pieces (a streamed model
+    response). feed() returns each top-level object/array element as soon as
+    its closing bracket arrives, using the same string-aware bracket scan as
+    extract_json. Anything before the opening '[' (code fences) is skipped,
+    as are elements that don't parse (counted in `skipped`).
+    """
+
+    def __init__(self) -> None:
+        self.skipped = 0  # elements dropped because they didn't parse
+        self._item: List[str] = []
+        self._depth = 0  # bracket depth inside the current element
+        self._in_string = False
+        self._escaped = False
+        self._state = "before"  # before -> in_array -> done
+
+    @property
+    def complete(self) -> bool:
+        """True once the array's closing ']' has been seen"""
+        return self._state == "done"
+
+    def feed(self, text: str) -> List[Any]:
+        items = []
+        for ch in text:
+            if self._state == "before":
+                if ch == "[":
+                    self._state = "in_array"
+                continue
+            if self._state == "done":
+                break
+
+            if self._depth == 0:
+                # Between elements: skip commas/whitespace, stop at the close
+                if ch in "[{":
+                    self._depth = 1
+                    self._item = [ch]
+                elif ch == "]":
+                    self._state = "done"
+                continue
+
+            self._item.append(ch)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                self._depth += 1
+            elif ch in "]}":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        items.append(orjson.loads("".join(self._item)))
+                    except orjson.JSONDecodeError:
+                        self.skipped += 1
+                    self._item = []
+        return items
+
+
+# Prompt text is cut at the last page / paragraph / line break before the
+# limit, as long as that keeps at least this fraction of the budget
+TRUNCATE_MIN_KEEP = 0.8
+TRUNCATE_BOUNDARIES = ("\n--- Page ", "\n\n", "\n")
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """
+    Cut text to at most max_chars on a natural boundary (whole pages first,
+    then paragraphs, then lines) so the model never sees a half page or a
+    word cut in two. Falls back to a hard cut if no boundary is close enough.
+    """
+    if len(text) <= max_chars:
+        return text
+
+    min_keep = int(max_chars * TRUNCATE_MIN_KEEP)
+    for boundary in TRUNCATE_BOUNDARIES:
+        cut = text.rfind(boundary, min_keep, max_chars)
+        if cut != -1:
+            return text[:cut]
+    return text[:max_chars]
+
+
 # Trade configurations
 TRADE_CONFIGS = {
     "masonry": {
@@ -172,27 +459,23 @@ async def analyze_division_with_gemini(
     division = config.get("division", "XX")
 
     max_chars = 200000
-    text_to_analyze = division_text[:max_chars]
+    text_to_analyze = truncate_text(division_text, max_chars)
     if len(division_text) > max_chars:
         text_to_analyze += "\n\n[TRUNCATED - additional content not shown]"
 
-    # Get trade-specific prompt from prompts.py
+    # Trade-specific prompt from prompts.py goes in the system instruction so
+    # every call for a trade shares an identical prefix (Gemini caches it)
     base_prompt = get_summarize_prompt(trade, division)
 
     prompt = f"""PROJECT: {project_name or "Construction Project"}
 DIVISION: {division} - {trade_name}
 
 SPECIFICATION TEXT:
-{text_to_analyze}
-
-=======================================================================
-INSTRUCTIONS:
-=======================================================================
-
-{base_prompt}"""
+{text_to_analyze}"""
 
     data = await gemini_request_with_retry(
         payload={
+            "systemInstruction": {"parts": [{"text": base_prompt}]},
             "contents": [{"parts": [{"text": prompt}]}],
             "generationConfig": {"temperature": 0.2, "maxOutputTokens": 16000},
         },
@@ -237,23 +520,9 @@ INSTRUCTIONS:
 # ═══════════════════════════════════════════════════════════════
 
 
-async def analyze_contract_terms(
-    div01_text: str, project_name: Optional[str] = None
-) -> Dict[str, Any]:
-    """
-    Analyze Division 00-01 for contract terms
-    """
-    max_chars = 150000
-    text_to_analyze = div01_text[:max_chars]
-    if len(div01_text) > max_chars:
-        text_to_analyze += "\n\n[TRUNCATED]"
-
-    prompt = f"""You are a construction contract analyst reviewing Division 00 (Procurement) and Division 01 (General Requirements) specifications.
-
-PROJECT: {project_name or "Construction Project"}
-
-SPECIFICATION TEXT:
-{text_to_analyze}
+# Fixed contract-terms instructions, sent as the system instruction so the
+# prefix is identical on every call and Gemini can serve it from cache
+CONTRACT_TERMS_INSTRUCTION = """You are a construction contract analyst reviewing Division 00 (Procurement) and Division 01 (General Requirements) specifications.
 
 Extract and summarize the following CONTRACT and BUSINESS terms in a CONDENSED format for contractors:
 
@@ -310,8 +579,26 @@ RULES:
 4. Flag anything unusual or risky
 5. Include specific dollar amounts, percentages, and timeframes"""
 
+
+async def analyze_contract_terms(
+    div01_text: str, project_name: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Analyze Division 00-01 for contract terms
+    """
+    max_chars = 150000
+    text_to_analyze = truncate_text(div01_text, max_chars)
+    if len(div01_text) > max_chars:
+        text_to_analyze += "\n\n[TRUNCATED]"
+
+    prompt = f"""PROJECT: {project_name or "Construction Project"}
+
+SPECIFICATION TEXT:
+{text_to_analyze}"""
+
     data = await gemini_request_with_retry(
         payload={
+            "systemInstruction": {"parts": [{"text": CONTRACT_TERMS_INSTRUCTION}]},
             "contents": [{"parts": [{"text": prompt}]}],
             "generationConfig": {"temperature": 0.2, "maxOutputTokens": 8000},
         },
@@ -340,35 +627,16 @@ RULES:
 # ═══════════════════════════════════════════════════════════════
 
 
-async def create_executive_summary(
-    trade_summary: str,
-    contract_summary: str,
-    trade: str,
-    project_name: Optional[str] = None,
-) -> str:
-    """
-    Stage 2: OpenAI creates SHORT executive bid summary.
-    Focuses on strategy since Gemini already extracted details.
-    """
-    if not OPENAI_API_KEY:
-        return "OpenAI API key not configured - skipping executive summary"
-
-    config = TRADE_CONFIGS.get(trade.lower(), {})
-    trade_name = config.get("name", trade.title())
-
-    # Truncate inputs to avoid token limits
-    trade_summary_truncated = trade_summary[:15000] if trade_summary else ""
-    contract_summary_truncated = contract_summary[:8000] if contract_summary else ""
-
-    prompt = f"""You are a {trade_name} estimator reviewing extracted spec data for {project_name or "a construction project"}.
+# Executive summary prompt, filled with str.format per call
+EXECUTIVE_SUMMARY_TEMPLATE = """You are a {trade_name} estimator reviewing extracted spec data for {project_name}.
 
 The detailed extraction is already done. Your job is to create a SHORT executive summary.
 
 === EXTRACTED SPEC DATA ===
-{trade_summary_truncated}
+{trade_summary}
 
 === CONTRACT TERMS ===
-{contract_summary_truncated}
+{contract_summary}
 
 === YOUR TASK ===
 
@@ -396,37 +664,74 @@ Create a BRIEF executive summary with these sections:
 
 KEEP IT SHORT AND ACTIONABLE. The detailed specs are already extracted - don't repeat them. Focus on what the estimator needs to DO before bid day."""
 
-    try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                OPENAI_API_URL,
-                headers={
-                    "Authorization": f"Bearer {OPENAI_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a construction bidding expert. Create concise, actionable bid summaries. Be specific - name actual products and suppliers from the spec data.",
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    "temperature": 0.3,
-                    "max_tokens": 1500,
-                },
-            )
 
-            if response.status_code != 200:
-                return f"Executive summary generation failed: {response.status_code}"
+# create_executive_summary returns these (instead of raising) when it fails
+EXECUTIVE_SUMMARY_FAILURE_PREFIXES = (
+    "OpenAI API key not configured",
+    "Executive summary generation failed",
+    "Executive summary error",
+    "No summary generated",
+)
 
-            data = response.json()
-            return (
-                data.get("choices", [{}])[0]
-                .get("message", {})
-                .get("content", "No summary generated")
-            )
+
+async def create_executive_summary(
+    trade_summary: str,
+    contract_summary: str,
+    trade: str,
+    project_name: Optional[str] = None,
+) -> str:
+    """
+    Stage 2: OpenAI creates SHORT executive bid summary.
+    Focuses on strategy since Gemini already extracted details.
+    """
+    if not OPENAI_API_KEY:
+        return "OpenAI API key not configured - skipping executive summary"
+
+    config = TRADE_CONFIGS.get(trade.lower(), {})
+    trade_name = config.get("name", trade.title())
+
+    # Truncate inputs to avoid token limits
+    trade_summary_truncated = truncate_text(trade_summary or "", 15000)
+    contract_summary_truncated = truncate_text(contract_summary or "", 8000)
+
+    prompt = EXECUTIVE_SUMMARY_TEMPLATE.format(
+        trade_name=trade_name,
+        project_name=project_name or "a construction project",
+        trade_summary=trade_summary_truncated,
+        contract_summary=contract_summary_truncated,
+    )
+
+    try:
+        response = await get_http_client().post(
+            OPENAI_API_URL,
+            headers={
+                "Authorization": f"Bearer {OPENAI_API_KEY}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "model": OPENAI_MODEL,
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": "You are a construction bidding expert. Create concise, actionable bid summaries. Be specific - name actual products and suppliers from the spec data.",
+                    },
+                    {"role": "user", "content": prompt},
+                ],
+                "temperature": 0.3,
+                "max_tokens": 1500,
+            },
+            timeout=60.0,
+        )
+
+        if response.status_code != 200:
+            return f"Executive summary generation failed: {response.status_code}"
+
+        data = response.json()
+        return (
+            data.get("choices", [{}])[0]
+            .get("message", {})
+            .get("content", "No summary generated")
+        )
     except Exception as e:
         return f"Executive summary error: {str(e)}"
 
@@ -441,6 +746,20 @@ SECTION_ANALYSIS_PAGE_THRESHOLD = 100
 # Maximum concurrent section extractions
 MAX_CONCURRENT_EXTRACTIONS = 5
 
+# Cache of section extractions keyed by content hash (prompt + model).
+# Re-analyzing a division re-sends identical sections, so hits skip Gemini.
+_section_cache: Dict[str, Dict[str, Any]] = {}
+_SECTION_CACHE_MAX = 256
+
+
+def _content_hash(*parts: str) -> str:
+    """SHA-256 over the given strings (used as a cache key)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
 
 async def extract_section(
     section_number: str,
@@ -459,6 +778,12 @@ async def extract_section(
 SPECIFICATION CONTENT:
 {content}"""
 
+    cache_key = _content_hash(GEMINI_API_URL, full_prompt)
+    cached = _section_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("[SECTION_%s] Cache hit, skipping Gemini", section_number)
+        return cached
+
     data = await gemini_request_with_retry(
         payload={
             "contents": [{"parts": [{"text": full_prompt}]}],
@@ -479,16 +804,23 @@ SPECIFICATION CONTENT:
         .get("text", "{}")
     )
 
-    # Parse JSON response
+    # Parse JSON response (extract_json tolerates fences/prose around the object)
     try:
-        return json.loads(result_text)
-    except json.JSONDecodeError:
+        result = extract_json(result_text)
+    except orjson.JSONDecodeError:
         return {
             "section": section_number,
             "raw_text": result_text[:2000],
             "parse_error": True,
         }
 
+    # Only cache successful parses; evict oldest entry when full
+    if len(_section_cache) >= _SECTION_CACHE_MAX:
+        _section_cache.pop(next(iter(_section_cache)))
+    _section_cache[cache_key] = result
+
+    return result
+
 
 async def combine_section_results(
     section_results: List[Dict[str, Any]],
@@ -501,13 +833,23 @@ async def combine_section_results(
     config = TRADE_CONFIGS.get(trade.lower(), TRADE_CONFIGS.get("general", {}))
     trade_name = config.get("name", trade.title())
 
-    # Format section results for the prompt
-    results_text = json.dumps(section_results, indent=2)
-
-    # Truncate if too long
+    # Format section results for the prompt (compact - indentation is pure token
+    # cost). If too long, drop whole trailing sections so the JSON stays valid.
     max_chars = 150000
+    results_text = orjson.dumps(section_results).decode()
     if len(results_text) > max_chars:
-        results_text = results_text[:max_chars] + "\n\n[TRUNCATED]"
+        kept = []
+        used = 2  # enclosing brackets
+        for section_result in section_results:
+            section_json = orjson.dumps(section_result).decode()
+            if used + len(section_json) + 1 > max_chars:
+                break
+            kept.append(section_json)
+            used += len(section_json) + 1
+        dropped = len(section_results) - len(kept)
+        results_text = (
+            f"[{','.join(kept)}]\n\n[TRUNCATED - {dropped} more sections not shown]"
+        )
 
     prompt = get_section_combine_prompt(
         trade_name=trade_name,
@@ -537,8 +879,8 @@ async def combine_section_results(
     )
 
     try:
-        return json.loads(result_text)
-    except json.JSONDecodeError:
+        return extract_json(result_text)
+    except orjson.JSONDecodeError:
         return {"raw_combined": result_text, "parse_error": True}
 
 
@@ -557,7 +899,7 @@ async def format_combined_for_output(
     trade_name = config.get("name", trade.title())
     base_prompt = get_summarize_prompt(trade, division)
 
-    combined_text = json.dumps(combined_data, indent=2)
+    combined_text = orjson.dumps(combined_data).decode()
 
     # Include contract info if available (for federal funding detection)
     contract_section = ""
@@ -616,6 +958,7 @@ async def analyze_division_by_section(
     project_name: Optional[str] = None,
     progress_callback: Optional[Callable[[str, int, int], None]] = None,
     contract_summary: Optional[str] = None,
+    contract_analysis: Optional[Awaitable[Dict[str, Any]]] = None,
 ) -> Dict[str, Any]:
     """
     Full section-by-section analysis pipeline for large divisions.
@@ -627,6 +970,9 @@ async def analyze_division_by_section(
         project_name: Optional project name
         progress_callback: Optional callback(status, current, total) for progress updates
         contract_summary: Optional pre-analyzed contract terms (for federal funding detection)
+        contract_analysis: Optional in-flight analyze_contract_terms() task, used
+            instead of contract_summary. Only awaited before Phase 3, so the
+            contract call overlaps the section extractions.
 
     Returns:
         Analysis result dict with trade_analysis, section_extractions, etc.
@@ -680,6 +1026,9 @@ async def analyze_division_by_section(
     if progress_callback:
         progress_callback("formatting", 0, 1)
 
+    if contract_analysis is not None:
+        contract_summary = (await contract_analysis).get("summary", "")
+
     # Phase 3: Format for output (include contract summary for federal funding detection)
     formatted_summary = await format_combined_for_output(
         combined_data, trade, division, project_name, contract_summary
@@ -702,6 +1051,36 @@ async def analyze_division_by_section(
     }
 
 
+def analysis_is_complete(result: Dict[str, Any], contract_expected: bool) -> bool:
+    """
+    False if a pipeline step failed softly and the result is degraded:
+    contract terms missing when Division 00/01 was sent, a section extraction
+    or the combine step that errored / didn't parse, or an executive summary
+    that is a failure message. Such results shouldn't be reused as-is.
+    """
+    if contract_expected and not result.get("contract_analysis"):
+        return False
+
+    for extraction in result.get("section_extractions") or []:
+        if isinstance(extraction, dict) and (
+            extraction.get("error") or extraction.get("parse_error")
+        ):
+            return False
+
+    combined = result.get("combined_data")
+    if isinstance(combined, dict) and combined.get("parse_error"):
+        return False
+
+    # Single-pass results get an executive summary when contract terms and an
+    # OpenAI key are both present
+    if "executive_summary" in result and contract_expected and OPENAI_API_KEY:
+        summary = result["executive_summary"]
+        if not summary or summary.startswith(EXECUTIVE_SUMMARY_FAILURE_PREFIXES):
+            return False
+
+    return True
+
+
 def should_use_section_analysis(page_count: int, section_count: int) -> bool:
     """
     Determine if section-by-section analysis should be used.
@@ -753,7 +1132,7 @@ async def run_full_analysis(
     if len(results) > 1 and not isinstance(results[1], Exception):
         contract_analysis = results[1]
     elif len(results) > 1 and isinstance(results[1], Exception):
-        print(f"[ANALYZE] Contract analysis failed (non-fatal): {results[1]}")
+        logger.warning("[ANALYZE] Contract analysis failed (non-fatal): %s", results[1])
 
     # Stage 2: Create executive summary
     executive_summary = None
@@ -766,7 +1145,7 @@ async def run_full_analysis(
                 project_name,
             )
         except Exception as e:
-            print(f"[ANALYZE] Executive summary failed (non-fatal): {e}")
+            logger.warning("[ANALYZE] Executive summary failed (non-fatal): %s", e)
 
     processing_time_ms = int((time.time() - start_time) * 1000)
 
@@ -6,18 +6,81 @@ Supports both:
 - Tile-based architecture (spec_tiles table) - LEGACY
 """
 
+import asyncio
+import logging
 import os
-from typing import Any, Dict, List, Optional
-
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import orjson
+from postgrest.types import ReturningMethod
 from supabase import Client, create_client
 
+# Child of main.py's "spec_analyzer" logger, which owns the queued handler
+logger = logging.getLogger("spec_analyzer.db")
+
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
+# Connection tuning for PostgREST calls
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE = 8
+HTTP_KEEPALIVE_EXPIRY = 60  # seconds
+
+_supabase: Optional[Client] = None
+_supabase_lock = threading.Lock()  # DB helpers are called from worker threads
+
+
+def _build_postgrest_session(session: httpx.Client) -> httpx.Client:
+    """
+    Rebuild the PostgREST session on an HTTP/2 keep-alive transport.
+    Multiplexes calls over one TCP+TLS connection and disables Nagle so
+    small requests aren't delayed.
+    """
+    transport = httpx.HTTPTransport(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)],
+    )
+    return httpx.Client(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=session.timeout,
+        transport=transport,
+    )
+
 
 def get_supabase() -> Client:
-    """Get Supabase client with service role key"""
-    return create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+    """Get Supabase client with service role key (shared across calls)"""
+    global _supabase
+    if _supabase is None:
+        with _supabase_lock:
+            if _supabase is None:
+                client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+                old_session = client.postgrest.session
+                client.postgrest.session = _build_postgrest_session(old_session)
+                old_session.close()
+                _supabase = client
+    return _supabase
+
+
+def warm_supabase() -> None:
+    """
+    Build the shared client and open its pooled connection up front (app
+    startup), so the first request doesn't pay client setup + TLS handshake.
+    """
+    try:
+        get_supabase().table("specs").select("id").limit(1).execute()
+        logger.info("[DB] Supabase connection pool warmed")
+    except Exception as e:
+        logger.warning("[DB] Supabase warm-up failed (will retry lazily): %s", e)
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -31,6 +94,7 @@ def create_spec(
     r2_key: str,
     original_name: str,
     page_count: Optional[int] = None,
+    content_hash: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Insert a new spec record"""
     client = get_supabase()
@@ -42,28 +106,115 @@ def create_spec(
         "original_name": original_name,
         "page_count": page_count,
         "status": "uploaded",
+        "content_hash": content_hash,
     }
 
     result = client.table("specs").insert(data).execute()
     return result.data[0] if result.data else None
 
 
-def get_spec(spec_id: str) -> Optional[Dict[str, Any]]:
-    """Get a spec by ID"""
+# Specs a duplicate upload may be pointed at. A "processing" spec is still
+# being parsed; the client would /parse it again alongside the running parse.
+# "failed" is fine - /parse re-runs it the usual way.
+DEDUP_SPEC_STATUSES = ("uploaded", "ready", "failed")
+
+
+def get_spec_by_content_hash(
+    user_id: str, job_id: str, content_hash: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Get a spec in this job that was uploaded with identical PDF bytes and
+    isn't mid-parse (see DEDUP_SPEC_STATUSES)
+    """
     client = get_supabase()
-    result = client.table("specs").select("*").eq("id", spec_id).single().execute()
+    result = (
+        client.table("specs")
+        .select("id, r2_key, status")
+        .eq("user_id", user_id)
+        .eq("job_id", job_id)
+        .eq("content_hash", content_hash)
+        .in_("status", list(DEDUP_SPEC_STATUSES))
+        .limit(1)
+        .execute()
+    )
+    return result.data[0] if result.data else None
+
+
+# Columns needed for existence/status checks and division routing - skips
+# the parse_result blob
+SPEC_STATUS_COLUMNS = "id, job_id, status, page_count, division_summary"
+
+
+# Spec rows are re-read by every endpoint (and by UI polling), so keep them
+# briefly; this process's own status updates invalidate them immediately
+SPEC_CACHE_TTL = 30  # seconds
+SPEC_CACHE_MAX = 256
+# Rows are stored serialized, so callers each decode their own copy and can't
+# mutate the cached row's nested division_summary / parse_result
+_spec_cache: Dict[Tuple[str, str], Tuple[float, bytes]] = {}
+_spec_cache_generation = 0  # bumped on invalidation, so in-flight reads don't re-cache
+_spec_cache_lock = threading.Lock()
+
+
+def invalidate_spec_cache(spec_id: Optional[str] = None) -> None:
+    """Drop cached rows for one spec, or all specs if spec_id is None"""
+    global _spec_cache_generation
+    with _spec_cache_lock:
+        _spec_cache_generation += 1
+        if spec_id is None:
+            _spec_cache.clear()
+            return
+        for key in [key for key in _spec_cache if key[0] == spec_id]:
+            del _spec_cache[key]
+
+
+def get_spec(spec_id: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+    """
+    Get a spec by ID (pass SPEC_STATUS_COLUMNS when the full row isn't needed).
+    Served from a short TTL cache when possible.
+    """
+    key = (spec_id, columns)
+    with _spec_cache_lock:
+        cached = _spec_cache.get(key)
+        generation = _spec_cache_generation
+    if cached and cached[0] > time.monotonic():
+        return orjson.loads(cached[1])
+
+    client = get_supabase()
+    result = client.table("specs").select(columns).eq("id", spec_id).single().execute()
+
+    if result.data:
+        with _spec_cache_lock:
+            # Skip if the spec was updated while this read was in flight
+            if generation == _spec_cache_generation:
+                _spec_cache.pop(key, None)
+                if len(_spec_cache) >= SPEC_CACHE_MAX:
+                    _spec_cache.pop(next(iter(_spec_cache)))  # oldest first
+                _spec_cache[key] = (
+                    time.monotonic() + SPEC_CACHE_TTL,
+                    orjson.dumps(result.data),
+                )
     return result.data
 
 
 def update_spec_status(
-    spec_id: str, status: str, page_count: Optional[int] = None
+    spec_id: str,
+    status: str,
+    page_count: Optional[int] = None,
+    division_summary: Optional[List[Dict[str, Any]]] = None,
+    parse_result: Optional[Dict[str, Any]] = None,
 ) -> None:
-    """Update spec status"""
+    """Update spec status (and optionally the precomputed division summary / parse result)"""
     client = get_supabase()
     data = {"status": status}
     if page_count is not None:
         data["page_count"] = page_count
+    if division_summary is not None:
+        data["division_summary"] = division_summary
+    if parse_result is not None:
+        data["parse_result"] = parse_result
     client.table("specs").update(data).eq("id", spec_id).execute()
+    invalidate_spec_cache(spec_id)
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -71,17 +222,36 @@ def update_spec_status(
 # ═══════════════════════════════════════════════════════════════
 
 
-def insert_pages_batch(pages: List[Dict[str, Any]], batch_size: int = 100) -> None:
-    """Insert pages in batches for efficiency"""
+async def insert_pages_batch(
+    pages: List[Dict[str, Any]], batch_size: int = 500, concurrency: int = 8
+) -> None:
+    """
+    Insert pages in multi-row batches, up to `concurrency` batches in flight
+    at once (each in a worker thread, multiplexed over the HTTP/2 session).
+    Rows aren't echoed back (returning=minimal) - by default PostgREST
+    returns every inserted row, full page content included.
+    """
     if not pages:
         return
 
     client = get_supabase()
-
-    for i in range(0, len(pages), batch_size):
-        batch = pages[i : i + batch_size]
-        client.table("spec_pages").insert(batch).execute()
-        print(f"[DB] Inserted batch {i // batch_size + 1} ({len(batch)} pages)")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def insert_batch(batch_num: int, batch: List[Dict[str, Any]]) -> None:
+        async with semaphore:
+            await asyncio.to_thread(
+                client.table("spec_pages")
+                .insert(batch, returning=ReturningMethod.minimal)
+                .execute
+            )
+        logger.debug("[DB] Inserted batch %s (%s pages)", batch_num, len(batch))
+
+    await asyncio.gather(
+        *(
+            insert_batch(i // batch_size + 1, pages[i : i + batch_size])
+            for i in range(0, len(pages), batch_size)
+        )
+    )
 
 
 def delete_pages(spec_id: str) -> None:
@@ -90,12 +260,33 @@ def delete_pages(spec_id: str) -> None:
     client.table("spec_pages").delete().eq("spec_id", spec_id).execute()
 
 
+async def clear_parsed_data(spec_id: str) -> None:
+    """
+    Delete pages plus legacy divisions/tiles for a spec before re-parsing.
+    The three deletes are independent, so they run concurrently.
+    """
+    client = get_supabase()
+    await asyncio.gather(
+        *(
+            asyncio.to_thread(
+                client.table(table).delete().eq("spec_id", spec_id).execute
+            )
+            for table in ("spec_pages", "spec_divisions", "spec_tiles")
+        )
+    )
+
+
+# Columns the analysis endpoints actually read from spec_pages - skips ids,
+# timestamps and the cross_refs arrays on every fetched page
+PAGE_CONTENT_COLUMNS = "page_number, section_number, content"
+
+
 def get_pages_by_division(spec_id: str, division_code: str) -> List[Dict[str, Any]]:
     """Get all pages for a specific division"""
     client = get_supabase()
     result = (
         client.table("spec_pages")
-        .select("*")
+        .select(PAGE_CONTENT_COLUMNS)
         .eq("spec_id", spec_id)
         .eq("division_code", division_code)
         .order("page_number")
@@ -104,6 +295,24 @@ def get_pages_by_division(spec_id: str, division_code: str) -> List[Dict[str, An
     return result.data or []
 
 
+def get_pages_by_divisions(
+    spec_id: str, division_codes: List[str]
+) -> List[Dict[str, Any]]:
+    """Get all pages for several divisions in one query, ordered by page number"""
+    if not division_codes:
+        return []
+    client = get_supabase()
+    result = (
+        client.table("spec_pages")
+        .select(PAGE_CONTENT_COLUMNS)
+        .eq("spec_id", spec_id)
+        .in_("division_code", division_codes)
+        .order("page_number")
+        .execute()
+    )
+    return result.data or []
+
+
 def get_pages_by_section(spec_id: str, section_number: str) -> List[Dict[str, Any]]:
     """
     Get all pages for a specific section (e.g., '07 92 00')
@@ -112,7 +321,7 @@ def get_pages_by_section(spec_id: str, section_number: str) -> List[Dict[str, An
     client = get_supabase()
     result = (
         client.table("spec_pages")
-        .select("*")
+        .select(PAGE_CONTENT_COLUMNS)
         .eq("spec_id", spec_id)
         .like("section_number", f"{section_number}%")
         .order("page_number")
@@ -121,43 +330,61 @@ def get_pages_by_section(spec_id: str, section_number: str) -> List[Dict[str, An
     return result.data or []
 
 
-def get_all_pages(spec_id: str) -> List[Dict[str, Any]]:
-    """Get all pages for a spec, ordered by page number"""
+def get_pages_by_sections(
+    spec_id: str, section_numbers: List[str]
+) -> List[Dict[str, Any]]:
+    """
+    Get pages for several sections in one query, with the same prefix match
+    as get_pages_by_section. A page matching more than one section is
+    returned once.
+    """
+    if not section_numbers:
+        return []
+
+    # PostgREST or=() filter; quote values (they contain spaces) and escape
+    # anything that would end the quoted string
+    patterns = ",".join(
+        'section_number.like."{}*"'.format(
+            section.replace("\\", "\\\\").replace('"', '\\"')
+        )
+        for section in section_numbers
+    )
     client = get_supabase()
     result = (
         client.table("spec_pages")
-        .select("*")
+        .select(PAGE_CONTENT_COLUMNS)
         .eq("spec_id", spec_id)
+        .or_(patterns)
         .order("page_number")
         .execute()
     )
     return result.data or []
 
 
-def get_division_summary(spec_id: str) -> List[Dict[str, Any]]:
-    """
-    Get summary of divisions in a spec.
-    Returns list of {division_code, page_count, sections}
-    """
+def get_all_pages(spec_id: str) -> List[Dict[str, Any]]:
+    """Get all pages for a spec, ordered by page number"""
     client = get_supabase()
-
-    # Get all pages grouped by division
     result = (
         client.table("spec_pages")
-        .select("division_code, section_number, page_number")
+        .select("*")
         .eq("spec_id", spec_id)
-        .not_.is_("division_code", "null")
-        .order("division_code")
+        .order("page_number")
         .execute()
     )
+    return result.data or []
 
-    if not result.data:
-        return []
 
+def build_division_summary(pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Aggregate page rows into a division summary.
+    Returns list of {division_code, page_count, sections, page_range}
+    """
     # Aggregate by division
     divisions = {}
-    for row in result.data:
-        div = row["division_code"]
+    for row in pages:
+        div = row.get("division_code")
+        if not div:
+            continue
         if div not in divisions:
             divisions[div] = {
                 "division_code": div,
@@ -188,6 +415,44 @@ def get_division_summary(spec_id: str) -> List[Dict[str, Any]]:
     return result_list
 
 
+def get_division_summary(
+    spec_id: str, spec: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Get summary of divisions in a spec.
+    Returns list of {division_code, page_count, sections, page_range}
+
+    Reads specs.division_summary (written at parse time) when the spec is ready.
+    Pass an already-fetched spec row to skip the lookup. Falls back to
+    aggregating spec_pages for specs parsed before the column existed.
+    """
+    client = get_supabase()
+
+    if spec is None:
+        spec = (
+            client.table("specs")
+            .select("status, division_summary")
+            .eq("id", spec_id)
+            .single()
+            .execute()
+        ).data or {}
+
+    if spec.get("status") == "ready" and spec.get("division_summary") is not None:
+        return spec["division_summary"]
+
+    # Get all pages grouped by division
+    result = (
+        client.table("spec_pages")
+        .select("division_code, section_number, page_number")
+        .eq("spec_id", spec_id)
+        .not_.is_("division_code", "null")
+        .order("division_code")
+        .execute()
+    )
+
+    return build_division_summary(result.data or [])
+
+
 def get_related_sections(spec_id: str, division_code: str) -> List[Dict[str, Any]]:
     """
     Get sections from OTHER divisions that are cross-referenced by this division.
@@ -274,50 +539,13 @@ def get_sections_for_division(spec_id: str, division_code: str) -> List[Dict[str
     """
     client = get_supabase()
 
-    # Get all pages for this division, grouped by section
-    result = (
-        client.table("spec_pages")
-        .select("section_number, page_number, content")
-        .eq("spec_id", spec_id)
-        .eq("division_code", division_code)
-        .not_.is_("section_number", "null")
-        .order("section_number")
-        .order("page_number")
-        .execute()
-    )
-
-    if not result.data:
-        return []
+    # Grouping and concatenation happen in Postgres (see sections_with_content RPC)
+    result = client.rpc(
+        "sections_with_content",
+        {"p_spec_id": spec_id, "p_division_code": division_code},
+    ).execute()
 
-    # Group by section
-    sections = {}
-    for row in result.data:
-        section = row["section_number"]
-        if section not in sections:
-            sections[section] = {
-                "section_number": section,
-                "pages": [],
-                "content_parts": [],
-            }
-        sections[section]["pages"].append(row["page_number"])
-        sections[section]["content_parts"].append(
-            f"--- Page {row['page_number']} ---\n{row['content']}"
-        )
-
-    # Build final list
-    result_list = []
-    for section_num in sorted(sections.keys()):
-        info = sections[section_num]
-        result_list.append(
-            {
-                "section_number": section_num,
-                "page_count": len(info["pages"]),
-                "pages": info["pages"],
-                "content": "\n\n".join(info["content_parts"]),
-            }
-        )
-
-    return result_list
+    return result.data or []
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -399,12 +627,21 @@ def insert_tile(
     return result.data[0] if result.data else None
 
 
-def insert_tiles_batch(tiles: List[Dict[str, Any]]) -> None:
-    """Batch insert tiles (legacy)"""
+def insert_tiles_batch(tiles: List[Dict[str, Any]], batch_size: int = 200) -> None:
+    """
+    Batch insert tiles (legacy) in chunks, so a large PDF doesn't become one
+    oversized request body. Rows aren't echoed back (returning=minimal).
+    """
     if not tiles:
         return
+
     client = get_supabase()
-    client.table("spec_tiles").insert(tiles).execute()
+
+    for i in range(0, len(tiles), batch_size):
+        batch = tiles[i : i + batch_size]
+        client.table("spec_tiles").insert(
+            batch, returning=ReturningMethod.minimal
+        ).execute()
 
 
 def get_tiles_by_division(spec_id: str, division_code: str) -> List[Dict[str, Any]]:
@@ -457,8 +694,13 @@ def insert_analysis(
     analysis_type: str,
     result: Dict[str, Any],
     processing_time_ms: int,
-) -> Dict[str, Any]:
-    """Insert an analysis result"""
+    input_hash: Optional[str] = None,
+    cross_refs_included: Optional[int] = None,
+) -> None:
+    """
+    Insert an analysis result.
+    Uses returning=minimal so PostgREST doesn't echo the (large) result blob back.
+    """
     client = get_supabase()
 
     data = {
@@ -468,11 +710,19 @@ def insert_analysis(
         "analysis_type": analysis_type,
         "result": result,
         "processing_time_ms": processing_time_ms,
-        "processing_time_ms": processing_time_ms,
+        "input_hash": input_hash,
+        "cross_refs_included": cross_refs_included,
     }
 
-    result_data = client.table("spec_analyses").insert(data).execute()
-    return result_data.data[0] if result_data.data else None
+    client.table("spec_analyses").insert(
+        data, returning=ReturningMethod.minimal
+    ).execute()
+
+
+# Columns returned by the analysis read endpoints
+ANALYSIS_COLUMNS = (
+    "id, division_code, analysis_type, created_at, processing_time_ms, result"
+)
 
 
 def get_analysis(spec_id: str, division_code: str) -> Optional[Dict[str, Any]]:
@@ -480,9 +730,27 @@ def get_analysis(spec_id: str, division_code: str) -> Optional[Dict[str, Any]]:
     client = get_supabase()
     result = (
         client.table("spec_analyses")
-        .select("*")
+        .select(ANALYSIS_COLUMNS)
+        .eq("spec_id", spec_id)
+        .eq("division_code", division_code)
+        .order("created_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+    return result.data[0] if result.data else None
+
+
+def get_analysis_by_input_hash(
+    spec_id: str, division_code: str, input_hash: str
+) -> Optional[Dict[str, Any]]:
+    """Get the latest analysis for a division produced from identical inputs"""
+    client = get_supabase()
+    result = (
+        client.table("spec_analyses")
+        .select("result, processing_time_ms, cross_refs_included")
         .eq("spec_id", spec_id)
         .eq("division_code", division_code)
+        .eq("input_hash", input_hash)
         .order("created_at", desc=True)
         .limit(1)
         .execute()
@@ -495,7 +763,7 @@ def get_all_analyses(spec_id: str) -> List[Dict[str, Any]]:
     client = get_supabase()
     result = (
         client.table("spec_analyses")
-        .select("*")
+        .select(ANALYSIS_COLUMNS)
         .eq("spec_id", spec_id)
         .order("created_at", desc=True)
         .execute()
@@ -508,64 +776,34 @@ def get_all_analyses(spec_id: str) -> List[Dict[str, Any]]:
 # ═══════════════════════════════════════════════════════════════
 
 
-def delete_job(job_id: str, user_id: str) -> bool:
+async def delete_job(job_id: str, user_id: str) -> bool:
     """
     Delete a job and all related data.
 
-    Manually deletes in correct order to respect foreign key constraints:
-    1. spec_analyses (references job_id and spec_id)
-    2. spec_pages (references spec_id)
-    3. spec_divisions (references spec_id) - legacy
-    4. spec_tiles (references spec_id) - legacy
-    5. specs (references job_id)
-    6. jobs
+    Runs the delete_job_cascade RPC, which checks ownership and deletes in
+    one transaction, in an order that respects foreign key constraints:
+    1. Leaf tables:
+       - spec_analyses (references job_id and spec_id)
+       - spec_pages (references spec_id)
+       - spec_divisions (references spec_id) - legacy
+       - spec_tiles (references spec_id) - legacy
+    2. specs (references job_id)
+    3. jobs
 
     Returns True if successful, False if job not found or not owned by user.
     """
     client = get_supabase()
 
-    # First verify the job exists and belongs to this user
-    result = (
-        client.table("jobs")
-        .select("id")
-        .eq("id", job_id)
-        .eq("user_id", user_id)
-        .execute()
+    result = await asyncio.to_thread(
+        client.rpc(
+            "delete_job_cascade", {"p_job_id": job_id, "p_user_id": user_id}
+        ).execute
     )
 
-    if not result.data:
+    if result.data is None:
         return False
 
-    # Get all specs for this job (needed to delete related records)
-    specs_result = client.table("specs").select("id").eq("job_id", job_id).execute()
-    spec_ids = [s["id"] for s in (specs_result.data or [])]
-
-    print(f"[DB] Deleting job {job_id} with {len(spec_ids)} specs")
-
-    # Delete in order to respect foreign key constraints
-    # 1. Delete spec_analyses (has FK to both jobs and specs)
-    client.table("spec_analyses").delete().eq("job_id", job_id).execute()
-    print(f"[DB] Deleted spec_analyses for job {job_id}")
-
-    # 2. Delete spec_pages for each spec
-    for spec_id in spec_ids:
-        client.table("spec_pages").delete().eq("spec_id", spec_id).execute()
-    print(f"[DB] Deleted spec_pages for {len(spec_ids)} specs")
-
-    # 3. Delete spec_divisions (legacy) for each spec
-    for spec_id in spec_ids:
-        client.table("spec_divisions").delete().eq("spec_id", spec_id).execute()
-
-    # 4. Delete spec_tiles (legacy) for each spec
-    for spec_id in spec_ids:
-        client.table("spec_tiles").delete().eq("spec_id", spec_id).execute()
-
-    # 5. Delete specs
-    client.table("specs").delete().eq("job_id", job_id).execute()
-    print(f"[DB] Deleted specs for job {job_id}")
-
-    # 6. Delete the job itself
-    client.table("jobs").delete().eq("id", job_id).execute()
-    print(f"[DB] Deleted job {job_id}")
-
+    # The deleted job's spec ids aren't known here - drop every cached spec
+    invalidate_spec_cache()
+    logger.info("[DB] Deleted job %s with %s specs", job_id, result.data)
     return True
@@ -14,16 +14,39 @@ Architecture: Page-Level Tagging
 """
 
 import asyncio
+import hashlib
+import io
+import logging
 import os
+import queue
+import re
+import shutil
+import subprocess
 import sys
-from typing import List, Optional
+import tempfile
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional
 from uuid import uuid4
 
+import httpx
+import orjson
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi import (
+    BackgroundTasks,
+    Depends,
+    FastAPI,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    UploadFile,
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 # Load environment variables (check both python-service/.env and parent .env)
 load_dotenv()  # python-service/.env
@@ -49,38 +72,84 @@ if not os.getenv("OPENAI_API_KEY"):
 
 # Import our modules
 from analyzer import (
+    CONTRACT_TERMS_INSTRUCTION,
+    EXECUTIVE_SUMMARY_TEMPLATE,
+    GEMINI_API_URL,
+    OPENAI_API_KEY,
+    OPENAI_MODEL,
     TRADE_CONFIGS,
+    analysis_is_complete,
     analyze_division_by_section,
+    close_http_client,
+    get_http_client,
+    truncate_text,
     run_full_analysis,
     should_use_section_analysis,
 )
 from db import (
+    SPEC_STATUS_COLUMNS,
+    build_division_summary,
+    clear_parsed_data,
     create_spec,
-    delete_divisions,
     delete_job,
-    delete_pages,
-    delete_tiles,
     get_all_analyses,
     get_analysis,
+    get_analysis_by_input_hash,
     get_division_summary,
     get_pages_by_division,
-    get_pages_by_section,
+    get_pages_by_divisions,
+    get_pages_by_sections,
     get_related_sections,
     get_sections_for_division,
     get_spec,
+    get_spec_by_content_hash,
     insert_analysis,
     insert_pages_batch,
     update_spec_status,
+    warm_supabase,
+)
+from parser import parse_spec, shutdown_process_pool
+from prompts import (
+    SECTION_COMBINE_PROMPT,
+    SECTION_EXTRACT_PROMPT,
+    get_summarize_prompt,
 )
-from parser import parse_spec
 from storage import (
+    DOWNLOAD_CHUNK_SIZE,
+    SUBMITTAL_EXTENSIONS,
+    SUBMITTAL_MIME_TYPES,
     delete_submittal_file,
     download_pdf,
     download_submittal_file,
+    download_submittal_file_stream,
+    upload_analysis_json,
     upload_pdf,
     upload_submittal_file,
 )
 
+# Division code -> trade name, built once instead of scanning TRADE_CONFIGS per
+# request (reversed so the first trade listed for a division wins, as before)
+DIVISION_TO_TRADE = {
+    config["division"]: trade_name
+    for trade_name, config in reversed(TRADE_CONFIGS.items())
+}
+
+# ═══════════════════════════════════════════════════════════════
+# LOGGING - handlers run on a listener thread, not the event loop
+# ═══════════════════════════════════════════════════════════════
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+_log_listener.start()
+
+# parser/analyzer/db log to "spec_analyzer.*" children, which propagate here
+logger = logging.getLogger("spec_analyzer")
+logger.setLevel(LOG_LEVEL)
+logger.addHandler(QueueHandler(_log_queue))
+logger.propagate = False
+
 # ═══════════════════════════════════════════════════════════════
 # AUTH - Supabase JWT Verification
 # ═══════════════════════════════════════════════════════════════
@@ -109,8 +178,6 @@ async def verify_token(
         return cached["user_id"]
 
     # Verify with Supabase Auth API
-    import httpx
-
     supabase_url = os.getenv("SUPABASE_URL")
     supabase_key = os.getenv("SUPABASE_SERVICE_KEY")
 
@@ -118,14 +185,15 @@ async def verify_token(
         raise HTTPException(status_code=500, detail="Auth not configured")
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                f"{supabase_url}/auth/v1/user",
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "apikey": supabase_key,
-                },
-            )
+        # Shared pooled client - cache misses don't pay a fresh TLS handshake
+        response = await get_http_client().get(
+            f"{supabase_url}/auth/v1/user",
+            headers={
+                "Authorization": f"Bearer {token}",
+                "apikey": supabase_key,
+            },
+            timeout=10.0,
+        )
 
         if response.status_code != 200:
             raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -163,6 +231,8 @@ app = FastAPI(
     title="Spec Analyzer API",
     description="PDF spec parsing and AI analysis service (Page-Level Architecture)",
     version="3.0.0",
+    # orjson serializes the large analysis/division payloads much faster
+    default_response_class=ORJSONResponse,
 )
 
 # CORS - allow all origins
@@ -174,14 +244,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-print("[BOOT] Spec Analyzer Service v3.0 (Page-Level Architecture)")
-print(f"[BOOT] SUPABASE_URL: {'OK' if os.getenv('SUPABASE_URL') else 'MISSING'}")
-print(
-    f"[BOOT] SUPABASE_SERVICE_KEY: {'OK' if os.getenv('SUPABASE_SERVICE_KEY') else 'MISSING'}"
+# Submittal file downloads are passed through as-is - PDFs, images and Office
+# files are already compressed, and gzip would drop their Content-Length.
+# The SSE stream is excluded too: gzip buffers small writes, holding events back.
+GZIP_EXCLUDED_PREFIXES = (
+    "/submittal/download/",
+    "/submittal/file",
+    "/extract-submittals/stream",
+)
+
+
+class JSONGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves file-download routes uncompressed"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(GZIP_EXCLUDED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Compress the large JSON responses (analyses, divisions, parse results)
+app.add_middleware(JSONGZipMiddleware, minimum_size=1024, compresslevel=5)
+
+
+@app.on_event("startup")
+async def warm_shared_resources():
+    """Open the pooled Supabase connection before the first request arrives"""
+    await asyncio.to_thread(warm_supabase)
+
+
+@app.on_event("shutdown")
+async def shutdown_shared_resources():
+    """Close pooled outbound HTTP connections, stop parse workers, flush logs"""
+    await close_http_client()
+    shutdown_process_pool()
+    _log_listener.stop()
+
+
+logger.info("[BOOT] Spec Analyzer Service v3.0 (Page-Level Architecture)")
+logger.info("[BOOT] SUPABASE_URL: %s", "OK" if os.getenv("SUPABASE_URL") else "MISSING")
+logger.info(
+    "[BOOT] SUPABASE_SERVICE_KEY: %s",
+    "OK" if os.getenv("SUPABASE_SERVICE_KEY") else "MISSING",
+)
+logger.info(
+    "[BOOT] R2_ACCOUNT_ID: %s", "OK" if os.getenv("R2_ACCOUNT_ID") else "MISSING"
+)
+logger.info(
+    "[BOOT] GEMINI_API_KEY: %s", "OK" if os.getenv("GEMINI_API_KEY") else "MISSING"
+)
+logger.info(
+    "[BOOT] OPENAI_API_KEY: %s", "OK" if os.getenv("OPENAI_API_KEY") else "MISSING"
 )
-print(f"[BOOT] R2_ACCOUNT_ID: {'OK' if os.getenv('R2_ACCOUNT_ID') else 'MISSING'}")
-print(f"[BOOT] GEMINI_API_KEY: {'OK' if os.getenv('GEMINI_API_KEY') else 'MISSING'}")
-print(f"[BOOT] OPENAI_API_KEY: {'OK' if os.getenv('OPENAI_API_KEY') else 'MISSING'}")
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -251,6 +366,18 @@ async def health_check():
 # POST /upload
 # ═══════════════════════════════════════════════════════════════
 
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(file_obj: BinaryIO) -> str:
+    """SHA-256 of a file object's contents, read in chunks; rewinds it after"""
+    digest = hashlib.sha256()
+    file_obj.seek(0)
+    for chunk in iter(lambda: file_obj.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
 
 @app.post("/upload", response_model=UploadResponse)
 async def upload_spec(
@@ -270,41 +397,69 @@ async def upload_spec(
     if user_id != auth_user_id:
         raise HTTPException(status_code=403, detail="User ID mismatch")
 
-    print(f"\n{'=' * 50}")
-    print(f"[UPLOAD] New upload request")
-    print(f"[UPLOAD] User: {user_id}")
-    print(f"[UPLOAD] Job: {job_id}")
-    print(f"[UPLOAD] File: {file.filename}")
-    print(f"{'=' * 50}\n")
+    logger.info("[UPLOAD] New upload request")
+    logger.debug("[UPLOAD] User: %s", user_id)
+    logger.debug("[UPLOAD] Job: %s", job_id)
+    logger.debug("[UPLOAD] File: %s", file.filename)
 
     # Validate file type
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="File must be a PDF")
 
     try:
-        # Read file bytes
-        pdf_bytes = await file.read()
-        print(f"[UPLOAD] File size: {len(pdf_bytes):,} bytes")
+        # Size from the spooled upload - the PDF is streamed to R2, never read
+        # into memory here
+        file_size = file.size
+        if file_size is None:
+            file_size = file.file.seek(0, os.SEEK_END)
+        file.file.seek(0)
+        logger.info("[UPLOAD] File size: %s bytes", file_size)
 
         # Enforce 100MB size limit
-        if len(pdf_bytes) > 100 * 1024 * 1024:
+        if file_size > 100 * 1024 * 1024:
             raise HTTPException(
                 status_code=413, detail="File too large. Maximum size is 100MB."
             )
 
+        # Same bytes already uploaded to this job - reuse that spec instead of
+        # storing and parsing the PDF again
+        content_hash = await asyncio.to_thread(file_sha256, file.file)
+        existing = await asyncio.to_thread(
+            get_spec_by_content_hash, user_id, job_id, content_hash
+        )
+        if existing:
+            logger.info(
+                "[UPLOAD] Duplicate of spec %s (%s), skipping upload",
+                existing["id"],
+                existing["status"],
+            )
+            return UploadResponse(
+                spec_id=existing["id"],
+                r2_key=existing["r2_key"],
+                original_name=file.filename,
+                status="deduplicated",
+            )
+
         # Generate spec_id
         spec_id = str(uuid4())
-        print(f"[UPLOAD] Generated spec_id: {spec_id}")
+        logger.debug("[UPLOAD] Generated spec_id: %s", spec_id)
 
         # Upload to R2
-        r2_key = upload_pdf(user_id, job_id, spec_id, pdf_bytes)
-        print(f"[UPLOAD] Uploaded to R2: {r2_key}")
+        r2_key = await asyncio.to_thread(
+            upload_pdf, user_id, job_id, spec_id, file.file
+        )
+        logger.info("[UPLOAD] Uploaded to R2: %s", r2_key)
 
         # Create database record
-        spec = create_spec(
-            user_id=user_id, job_id=job_id, r2_key=r2_key, original_name=file.filename
+        spec = await asyncio.to_thread(
+            create_spec,
+            user_id=user_id,
+            job_id=job_id,
+            r2_key=r2_key,
+            original_name=file.filename,
+            content_hash=content_hash,
         )
-        print(f"[UPLOAD] Created spec record: {spec['id']}")
+        logger.info("[UPLOAD] Created spec record: %s", spec["id"])
 
         return UploadResponse(
             spec_id=spec["id"],
@@ -314,7 +469,7 @@ async def upload_spec(
         )
 
     except Exception as e:
-        print(f"[UPLOAD] ERROR: {e}")
+        logger.error("[UPLOAD] ERROR: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -322,64 +477,92 @@ async def upload_spec(
 # POST /parse/{spec_id}
 # ═══════════════════════════════════════════════════════════════
 
+# Parses allowed to run at once. Page extraction already fans out to the
+# parser's worker processes; extra parses would only queue on that pool while
+# their in-thread steps compete with the event loop for the GIL.
+MAX_CONCURRENT_PARSES = int(os.getenv("MAX_CONCURRENT_PARSES", "2"))
+_parse_semaphore = asyncio.Semaphore(MAX_CONCURRENT_PARSES)
+
 
 @app.post("/parse/{spec_id}", response_model=ParseResponse)
-async def parse_spec_endpoint(spec_id: str, auth_user_id: str = Depends(verify_token)):
+async def parse_spec_endpoint(
+    spec_id: str,
+    force: bool = False,
+    auth_user_id: str = Depends(verify_token),
+):
     """
     Parse a PDF specification into pages with section tags.
 
+    Specs that are already parsed return the stored result without touching
+    R2 or re-parsing; pass ?force=true to re-parse.
+
     Page-Level Architecture:
     - Each page is individually tagged with its section number
     - Section number detected from page header/footer
     - No range calculation or merging
     - Query by division_code for accurate division content
     """
-    print(f"\n{'=' * 50}", flush=True)
-    print(f"[PARSE] Parsing spec: {spec_id}", flush=True)
-    print(f"[PARSE] Architecture: Page-Level Tagging", flush=True)
-    print(f"{'=' * 50}\n", flush=True)
-    sys.stdout.flush()
+    logger.info("[PARSE] Parsing spec: %s", spec_id)
+    logger.debug("[PARSE] Architecture: Page-Level Tagging")
 
-    # Get spec record
-    spec = get_spec(spec_id)
+    # Get spec record (DB/R2 calls below are blocking - run them off the event loop)
+    spec = await asyncio.to_thread(get_spec, spec_id)
     if not spec:
         raise HTTPException(status_code=404, detail="Spec not found")
 
-    print(f"[PARSE] Found spec: {spec['original_name']}", flush=True)
-    print(f"[PARSE] R2 key: {spec['r2_key']}", flush=True)
-    sys.stdout.flush()
+    logger.info("[PARSE] Found spec: %s", spec["original_name"])
 
-    try:
-        # Update status to processing
-        update_spec_status(spec_id, "processing")
-        print("[PARSE] Status updated to processing", flush=True)
+    # Already parsed - skip the download and parse entirely
+    if not force and spec["status"] == "ready" and spec.get("parse_result"):
+        logger.info("[PARSE] Spec already parsed, returning stored result")
+        return ParseResponse(spec_id=spec_id, status="ready", **spec["parse_result"])
 
-        # Download PDF from R2
-        print("[PARSE] Downloading PDF from R2...", flush=True)
-        sys.stdout.flush()
-        pdf_bytes = download_pdf(spec["r2_key"])
-        print(f"[PARSE] Downloaded {len(pdf_bytes):,} bytes", flush=True)
+    # A second parse would interleave its clear/insert steps with the running
+    # one and duplicate spec_pages. ?force=true overrides (e.g. a spec left
+    # "processing" by a crashed worker).
+    if not force and spec["status"] == "processing":
+        logger.warning("[PARSE] Spec is already being parsed")
+        raise HTTPException(status_code=409, detail="Spec is already being parsed")
 
-        # Clear existing data (for re-parsing)
-        print("[PARSE] Clearing existing pages/divisions/tiles...")
-        delete_pages(spec_id)
-        delete_divisions(spec_id)  # Legacy cleanup
-        delete_tiles(spec_id)  # Legacy cleanup
+    logger.debug("[PARSE] R2 key: %s", spec["r2_key"])
 
-        # Parse the PDF with page-level tagging
-        print("[PARSE] Parsing pages with section detection...")
-        result = parse_spec(pdf_bytes, spec_id)
+    try:
+        # Status update, R2 download and clearing existing data (for re-parsing)
+        # are independent - run them together. Wait for all three before
+        # failing so a late "processing" write can't overwrite "failed".
+        logger.info("[PARSE] Downloading PDF from R2...")
+        logger.info("[PARSE] Clearing existing pages/divisions/tiles...")
+        setup_results = await asyncio.gather(
+            asyncio.to_thread(update_spec_status, spec_id, "processing"),
+            asyncio.to_thread(download_pdf, spec["r2_key"]),
+            clear_parsed_data(spec_id),  # Includes legacy divisions/tiles
+            return_exceptions=True,
+        )
+        for setup_result in setup_results:
+            if isinstance(setup_result, BaseException):
+                raise setup_result
+        pdf_bytes = setup_results[1]
+        logger.debug("[PARSE] Status updated to processing")
+        logger.info("[PARSE] Downloaded %s bytes", len(pdf_bytes))
+
+        # Parse the PDF with page-level tagging (CPU-bound, keep it off the event loop)
+        logger.info("[PARSE] Parsing pages with section detection...")
+        # ?force=true bypasses the content-addressed parse cache
+        async with _parse_semaphore:
+            result = await asyncio.to_thread(
+                parse_spec, pdf_bytes, spec_id, use_cache=not force
+            )
+
+        # Raw PDF is no longer needed - don't hold it through the DB inserts
+        del pdf_bytes
 
-        print(f"[PARSE] Found {len(result['divisions'])} divisions")
-        print(f"[PARSE] Processed {len(result['pages'])} pages with content")
+        logger.info("[PARSE] Found %s divisions", len(result["divisions"]))
+        logger.info("[PARSE] Processed %s pages with content", len(result["pages"]))
 
         # Insert pages in batches
         if result["pages"]:
-            print(f"[PARSE] Inserting {len(result['pages'])} pages...")
-            insert_pages_batch(result["pages"])
-
-        # Update spec status
-        update_spec_status(spec_id, "ready", result["page_count"])
+            logger.info("[PARSE] Inserting %s pages...", len(result["pages"]))
+            await insert_pages_batch(result["pages"])
 
         # Build division list for response
         division_list = []
@@ -396,28 +579,42 @@ async def parse_spec_endpoint(spec_id: str, auth_user_id: str = Depends(verify_t
                 }
             )
 
-        print(f"\n[PARSE] Complete!")
+        logger.info("[PARSE] Complete!")
         for div in division_list:
-            print(
-                f"[PARSE]   Division {div['code']}: {div['page_count']} pages ({div['page_range']})"
+            logger.debug(
+                "[PARSE]   Division %s: %s pages (%s)",
+                div["code"],
+                div["page_count"],
+                div["page_range"],
             )
 
-        return ParseResponse(
-            spec_id=spec_id,
-            status="ready",
-            page_count=result["page_count"],
-            division_count=len(result["divisions"]),
-            divisions=division_list,
-            toc_found=result.get("toc_found", False),
-            classification_stats=result.get("classification_stats"),
+        parse_result = {
+            "page_count": result["page_count"],
+            "division_count": len(result["divisions"]),
+            "divisions": division_list,
+            "toc_found": result.get("toc_found", False),
+            "classification_stats": result.get("classification_stats"),
+        }
+
+        # Update spec status and store the division summary for GET /divisions
+        # plus the parse result so repeat /parse calls can skip the work.
+        # Awaited, not backgrounded: /analyze requires "ready", and a failed
+        # write must mark the spec failed (below) rather than leave it
+        # "processing"
+        await asyncio.to_thread(
+            update_spec_status,
+            spec_id,
+            "ready",
+            result["page_count"],
+            division_summary=build_division_summary(result["pages"]),
+            parse_result=parse_result,
         )
 
-    except Exception as e:
-        print(f"[PARSE] ERROR: {e}")
-        import traceback
+        return ParseResponse(spec_id=spec_id, status="ready", **parse_result)
 
-        traceback.print_exc()
-        update_spec_status(spec_id, "failed")
+    except Exception as e:
+        logger.exception("[PARSE] ERROR: %s", e)
+        await asyncio.to_thread(update_spec_status, spec_id, "failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -426,13 +623,168 @@ async def parse_spec_endpoint(spec_id: str, auth_user_id: str = Depends(verify_t
 # ═══════════════════════════════════════════════════════════════
 
 
+# Section-by-section pipeline data the UI never reads back from spec_analyses
+ANALYSIS_INTERMEDIATE_KEYS = ("section_extractions", "combined_data")
+
+# Bookkeeping offload_analysis_intermediates adds to the stored row
+ANALYSIS_STORAGE_KEYS = ("intermediates_r2_key", "intermediates_bytes")
+
+
+def analysis_response_result(analysis_result: dict) -> dict:
+    """
+    The analysis as returned by /analyze: without the intermediates (or
+    their R2 pointer), so a fresh run and an input-hash cache hit - whose
+    stored row has them offloaded - return the same shape.
+    """
+    excluded = ANALYSIS_INTERMEDIATE_KEYS + ANALYSIS_STORAGE_KEYS
+    return {key: value for key, value in analysis_result.items() if key not in excluded}
+
+
+async def store_analysis(
+    spec_id: str, division: str, analysis_result: dict, **row
+) -> None:
+    """
+    Save an analysis to spec_analyses after the response has been sent
+    (queued with BackgroundTasks). Errors are logged - the client already has
+    the result.
+    """
+    try:
+        stored_result = await offload_analysis_intermediates(
+            spec_id, division, analysis_result
+        )
+        await asyncio.to_thread(
+            insert_analysis,
+            spec_id=spec_id,
+            division_code=division,
+            result=stored_result,
+            **row,
+        )
+        logger.info("[ANALYZE] Saved analysis for division %s", division)
+    except Exception as e:
+        logger.exception("[ANALYZE] Background save failed: %s", e)
+
+
+async def offload_analysis_intermediates(
+    spec_id: str, division: str, analysis_result: dict
+) -> dict:
+    """
+    Move bulky intermediate results to R2 so the spec_analyses JSONB row only
+    keeps what's displayed. Returns the result to store (the client never
+    gets the intermediates - see analysis_response_result). Falls back to
+    storing inline if the upload fails.
+    """
+    intermediates = {
+        key: analysis_result[key]
+        for key in ANALYSIS_INTERMEDIATE_KEYS
+        if key in analysis_result
+    }
+    if not intermediates:
+        return analysis_result
+
+    data = orjson.dumps(intermediates)
+    try:
+        r2_key = await asyncio.to_thread(upload_analysis_json, spec_id, division, data)
+    except Exception as e:
+        logger.warning("[ANALYZE] Intermediates upload failed, storing inline: %s", e)
+        return analysis_result
+
+    logger.info(
+        "[ANALYZE] Stored %s bytes of intermediates in R2: %s", len(data), r2_key
+    )
+    stored_result = {
+        key: value
+        for key, value in analysis_result.items()
+        if key not in ANALYSIS_INTERMEDIATE_KEYS
+    }
+    stored_result["intermediates_r2_key"] = r2_key
+    stored_result["intermediates_bytes"] = len(data)
+    return stored_result
+
+
+# Bump when the analysis pipeline changes in a way analysis_input_hash doesn't
+# capture, so stored analyses stop matching new requests - in particular any
+# edit to the prompt text written inline in analyzer.py
+# (analyze_division_with_gemini, analyze_contract_terms,
+# format_combined_for_output, the OpenAI system message) or to generation
+# settings
+ANALYSIS_CACHE_VERSION = 1
+
+
+def analysis_input_hash(
+    division: str,
+    trade: str,
+    request: AnalyzeRequest,
+    division_content: List[dict],
+    contract_pages: List[dict],
+    related_pages: List[dict],
+) -> str:
+    """
+    SHA-256 over everything an analysis depends on: model, prompts, request
+    options and the page content sent to Gemini. A stored analysis with the
+    same hash would be regenerated identically, so it can be returned as is.
+    division_content is the division's pages (single-pass) or its
+    sections_with_content rows (section-by-section).
+    """
+    key = [
+        ANALYSIS_CACHE_VERSION,
+        GEMINI_API_URL,
+        OPENAI_MODEL,
+        bool(OPENAI_API_KEY),  # no key -> no executive summary
+        get_summarize_prompt(trade, division),
+        CONTRACT_TERMS_INSTRUCTION,
+        SECTION_EXTRACT_PROMPT,
+        SECTION_COMBINE_PROMPT,
+        EXECUTIVE_SUMMARY_TEMPLATE,
+        division,
+        request.project_name,
+        request.related_sections,
+        [
+            (d.get("page_number"), d["section_number"], d["content"])
+            for d in division_content
+        ],
+        [(p["page_number"], p["content"]) for p in contract_pages],
+        [(p["page_number"], p["section_number"], p["content"]) for p in related_pages],
+    ]
+    return hashlib.sha256(orjson.dumps(key)).hexdigest()
+
+
+def format_pages_text(pages: List[dict], section_label: Optional[str] = None) -> str:
+    """
+    Join pages as "--- Page N ---" blocks separated by blank lines, e.g.
+    "--- Page 12 (Section 04 20 00) ---" when section_label is given.
+    Pages must already be in page order - the db page queries ORDER BY
+    page_number. Written in one pass into a StringIO rather than building a
+    list of formatted copies for join (division text can run to megabytes).
+    """
+    buf = io.StringIO()
+    write = buf.write
+    for i, page in enumerate(pages):
+        if i:
+            write("\n\n")
+        write("--- Page ")
+        write(str(page["page_number"]))
+        if section_label:
+            write(f" ({section_label} {page['section_number'] or 'unknown'})")
+        write(" ---\n")
+        write(page["content"])
+    return buf.getvalue()
+
+
 @app.post("/analyze/{spec_id}", response_model=AnalyzeResponse)
 async def analyze_spec_endpoint(
-    spec_id: str, request: AnalyzeRequest, auth_user_id: str = Depends(verify_token)
+    spec_id: str,
+    request: AnalyzeRequest,
+    background: BackgroundTasks,
+    force: bool = False,
+    auth_user_id: str = Depends(verify_token),
 ):
     """
     Run AI analysis on a specific division.
 
+    If the same inputs (pages, options, prompts, model) were already analyzed,
+    the stored analysis is returned without calling Gemini; pass ?force=true
+    to re-run.
+
     Page-Level Architecture:
     - Fetches all pages tagged with the requested division_code
     - For large divisions (100+ pages with multiple sections): uses section-by-section analysis
@@ -443,14 +795,12 @@ async def analyze_spec_endpoint(
     """
     division = request.division.zfill(2)  # Ensure 2-digit format
 
-    print(f"\n{'=' * 50}")
-    print(f"[ANALYZE] Analyzing spec: {spec_id}")
-    print(f"[ANALYZE] Division: {division}")
-    print(f"[ANALYZE] Include contract terms: {request.include_contract_terms}")
-    print(f"{'=' * 50}\n")
+    logger.info("[ANALYZE] Analyzing spec: %s", spec_id)
+    logger.info("[ANALYZE] Division: %s", division)
+    logger.info("[ANALYZE] Include contract terms: %s", request.include_contract_terms)
 
     # Get spec record
-    spec = get_spec(spec_id)
+    spec = await asyncio.to_thread(get_spec, spec_id, SPEC_STATUS_COLUMNS)
     if not spec:
         raise HTTPException(status_code=404, detail="Spec not found")
 
@@ -461,92 +811,125 @@ async def analyze_spec_endpoint(
         )
 
     # Determine trade from division
-    trade = None
-    for trade_name, config in TRADE_CONFIGS.items():
-        if config["division"] == division:
-            trade = trade_name
-            break
-
-    if not trade:
-        trade = "general"  # Default trade
+    trade = DIVISION_TO_TRADE.get(division, "general")  # Default trade
 
-    print(f"[ANALYZE] Trade: {trade}")
+    logger.info("[ANALYZE] Trade: %s", trade)
 
     try:
-        # Get pages for requested division
-        print(f"[ANALYZE] Fetching pages for Division {division}...")
-        division_pages = get_pages_by_division(spec_id, division)
-
-        if not division_pages:
+        # Page/section counts from the division summary stored at parse time
+        # decide the analysis mode before any page content is fetched
+        division_summary = await asyncio.to_thread(get_division_summary, spec_id, spec)
+        division_info = next(
+            (d for d in division_summary if d["division_code"] == division), None
+        )
+        if not division_info or not division_info["page_count"]:
             raise HTTPException(
                 status_code=404, detail=f"No pages found for Division {division}"
             )
 
-        print(f"[ANALYZE] Found {len(division_pages)} pages")
-
-        # Get sections for this division (for section-by-section check)
-        sections = get_sections_for_division(spec_id, division)
-        section_count = len(sections)
-        page_count = len(division_pages)
+        page_count = division_info["page_count"]
+        section_count = len(division_info["sections"])
 
-        print(
-            f"[ANALYZE] Division has {section_count} sections across {page_count} pages"
+        logger.info(
+            "[ANALYZE] Division has %s sections across %s pages",
+            section_count,
+            page_count,
         )
 
         # Decide: section-by-section or single-pass?
         use_section_analysis = should_use_section_analysis(page_count, section_count)
 
+        # Fetch only the division content the chosen mode reads (its sections
+        # or its pages), plus Division 00/01 for contract terms and the
+        # user-selected related sections - independent reads, so fetch
+        # together. Related sections are deduplicated, request order kept;
+        # all their pages come back from one query, each page once.
+        logger.info("[ANALYZE] Fetching content for Division %s...", division)
+        related_sections = list(dict.fromkeys(request.related_sections or []))
+        contract_divisions = ["00", "01"] if request.include_contract_terms else []
+        division_fetch = (
+            get_sections_for_division if use_section_analysis else get_pages_by_division
+        )
+        division_content, related_pages, contract_pages = await asyncio.gather(
+            asyncio.to_thread(division_fetch, spec_id, division),
+            asyncio.to_thread(get_pages_by_sections, spec_id, related_sections),
+            asyncio.to_thread(get_pages_by_divisions, spec_id, contract_divisions),
+        )
         if use_section_analysis:
-            print(f"[ANALYZE] Using SECTION-BY-SECTION analysis (large division)")
-            print(
-                f"[ANALYZE] Sections to analyze: {[s['section_number'] for s in sections]}"
+            sections = division_content
+            division_page_numbers = {n for s in sections for n in s["pages"]}
+        else:
+            division_pages = division_content
+            division_page_numbers = {p["page_number"] for p in division_pages}
+
+        # Related sections that sit inside this division would send the same
+        # pages to Gemini twice - keep only pages the division doesn't have
+        related_pages = [
+            p for p in related_pages if p["page_number"] not in division_page_numbers
+        ]
+
+        # Identical inputs already analyzed - skip the Gemini calls entirely
+        input_hash = analysis_input_hash(
+            division, trade, request, division_content, contract_pages, related_pages
+        )
+        if not force:
+            stored = await asyncio.to_thread(
+                get_analysis_by_input_hash, spec_id, division, input_hash
             )
+            if stored:
+                logger.info(
+                    "[ANALYZE] Inputs unchanged since last analysis, returning it"
+                )
+                return AnalyzeResponse(
+                    spec_id=spec_id,
+                    division=division,
+                    pages_analyzed=page_count,
+                    cross_refs_included=stored["cross_refs_included"] or 0,
+                    analysis=analysis_response_result(stored["result"]),
+                    processing_time_ms=stored["processing_time_ms"],
+                )
 
-            # Analyze contract terms FIRST so we can pass to section analysis
-            # (needed for federal funding detection in final output)
-            contract_analysis = None
-            contract_summary_text = None
-            if request.include_contract_terms:
-                div00_pages = get_pages_by_division(spec_id, "00")
-                div01_pages = get_pages_by_division(spec_id, "01")
-                contract_pages = div00_pages + div01_pages
-
-                if contract_pages:
-                    from analyzer import analyze_contract_terms
-
-                    div01_text = "\n\n".join(
-                        [
-                            f"--- Page {p['page_number']} ---\n{p['content']}"
-                            for p in sorted(
-                                contract_pages, key=lambda x: x["page_number"]
-                            )
-                        ]
-                    )
-                    print(f"[ANALYZE] Contract text: {len(div01_text):,} chars")
-                    contract_analysis = await analyze_contract_terms(
-                        div01_text, request.project_name
-                    )
-                    contract_summary_text = contract_analysis.get("summary", "")
-                    print(f"[ANALYZE] Contract analysis complete")
+        if use_section_analysis:
+            logger.info("[ANALYZE] Using SECTION-BY-SECTION analysis (large division)")
+            logger.debug(
+                "[ANALYZE] Sections to analyze: %s",
+                [s["section_number"] for s in sections],
+            )
+
+            # Contract terms run alongside the section extractions - the
+            # summary is only needed for the final formatting step (federal
+            # funding detection), where analyze_division_by_section awaits it
+            contract_task = None
+            if contract_pages:
+                from analyzer import analyze_contract_terms
+
+                div01_text = format_pages_text(contract_pages)
+                logger.info("[ANALYZE] Contract text: %s chars", len(div01_text))
+                contract_task = asyncio.create_task(
+                    analyze_contract_terms(div01_text, request.project_name)
+                )
 
             # Add user-selected related sections to the sections list
             related_section_count = 0
-            if request.related_sections:
-                print(
-                    f"[ANALYZE] Including {len(request.related_sections)} user-selected related sections"
+            if related_sections:
+                logger.info(
+                    "[ANALYZE] Including %s user-selected related sections",
+                    len(related_sections),
                 )
-                for section_num in request.related_sections:
-                    section_pages = get_pages_by_section(spec_id, section_num)
+                # Each fetched page goes to the first requested section it
+                # matches, so overlapping selections don't repeat pages
+                pages_by_section = {section_num: [] for section_num in related_sections}
+                for page in related_pages:
+                    page_section = page["section_number"] or ""
+                    for section_num in related_sections:
+                        if page_section.startswith(section_num):
+                            pages_by_section[section_num].append(page)
+                            break
+
+                for section_num, section_pages in pages_by_section.items():
                     if section_pages:
                         # Build section dict matching the expected format
-                        related_content = "\n\n".join(
-                            [
-                                f"--- Page {p['page_number']} ---\n{p['content']}"
-                                for p in sorted(
-                                    section_pages, key=lambda x: x["page_number"]
-                                )
-                            ]
-                        )
+                        related_content = format_pages_text(section_pages)
                         sections.append(
                             {
                                 "section_number": section_num,
@@ -556,83 +939,67 @@ async def analyze_spec_endpoint(
                             }
                         )
                         related_section_count += 1
-                print(
-                    f"[ANALYZE] Added {related_section_count} related sections to analysis"
+                logger.info(
+                    "[ANALYZE] Added %s related sections to analysis",
+                    related_section_count,
                 )
 
             # Run section-by-section analysis with contract info
-            analysis_result = await analyze_division_by_section(
-                sections=sections,
-                trade=trade,
-                division=division,
-                project_name=request.project_name,
-                contract_summary=contract_summary_text,
-            )
+            try:
+                analysis_result = await analyze_division_by_section(
+                    sections=sections,
+                    trade=trade,
+                    division=division,
+                    project_name=request.project_name,
+                    contract_analysis=contract_task,
+                )
+            finally:
+                if contract_task is not None and not contract_task.done():
+                    contract_task.cancel()
 
             # Add contract analysis to result
-            if contract_analysis:
-                analysis_result["contract_analysis"] = contract_analysis
+            if contract_task is not None:
+                analysis_result["contract_analysis"] = contract_task.result()
+                logger.info("[ANALYZE] Contract analysis complete")
 
             cross_ref_count = related_section_count
 
         else:
-            print(f"[ANALYZE] Using SINGLE-PASS analysis (small division)")
+            logger.info("[ANALYZE] Using SINGLE-PASS analysis (small division)")
 
             # Build division text from pages
-            division_text = "\n\n".join(
-                [
-                    f"--- Page {p['page_number']} (Section {p['section_number'] or 'unknown'}) ---\n{p['content']}"
-                    for p in sorted(division_pages, key=lambda x: x["page_number"])
-                ]
-            )
-            print(f"[ANALYZE] Division text: {len(division_text):,} chars")
+            division_text = format_pages_text(division_pages, "Section")
+            logger.info("[ANALYZE] Division text: %s chars", len(division_text))
 
             # Add user-selected related sections
-            related_section_pages = []
-            if request.related_sections:
-                print(
-                    f"[ANALYZE] Including {len(request.related_sections)} user-selected related sections"
+            related_section_pages = related_pages
+            if related_sections:
+                logger.info(
+                    "[ANALYZE] Including %s user-selected related sections",
+                    len(related_sections),
                 )
-                for section_num in request.related_sections:
-                    section_pages = get_pages_by_section(spec_id, section_num)
-                    related_section_pages.extend(section_pages)
 
                 if related_section_pages:
-                    related_text = "\n\n".join(
-                        [
-                            f"--- Page {p['page_number']} (Related Section {p['section_number'] or 'unknown'}) ---\n{p['content']}"
-                            for p in sorted(
-                                related_section_pages, key=lambda x: x["page_number"]
-                            )
-                        ]
+                    related_text = format_pages_text(
+                        related_section_pages, "Related Section"
                     )
                     division_text += f"\n\n{'=' * 60}\nRELATED SECTIONS (Cross-Referenced)\n{'=' * 60}\n\n{related_text}"
-                    print(
-                        f"[ANALYZE] Added {len(related_section_pages)} related section pages ({len(related_text):,} chars)"
+                    logger.info(
+                        "[ANALYZE] Added %s related section pages (%s chars)",
+                        len(related_section_pages),
+                        len(related_text),
                     )
 
             cross_ref_count = len(related_section_pages)
 
             # Get Division 00/01 for contract terms
             div01_text = None
-            if request.include_contract_terms:
-                div00_pages = get_pages_by_division(spec_id, "00")
-                div01_pages = get_pages_by_division(spec_id, "01")
-                contract_pages = div00_pages + div01_pages
-
-                if contract_pages:
-                    div01_text = "\n\n".join(
-                        [
-                            f"--- Page {p['page_number']} ---\n{p['content']}"
-                            for p in sorted(
-                                contract_pages, key=lambda x: x["page_number"]
-                            )
-                        ]
-                    )
-                    print(f"[ANALYZE] Contract text: {len(div01_text):,} chars")
+            if contract_pages:
+                div01_text = format_pages_text(contract_pages)
+                logger.info("[ANALYZE] Contract text: %s chars", len(div01_text))
 
             # Run AI analysis
-            print("[ANALYZE] Running AI analysis...")
+            logger.info("[ANALYZE] Running AI analysis...")
             analysis_result = await run_full_analysis(
                 division_text=division_text,
                 div01_text=div01_text,
@@ -640,37 +1007,45 @@ async def analyze_spec_endpoint(
                 project_name=request.project_name,
             )
 
-        # Store in database
-        print("[ANALYZE] Saving analysis to database...")
-        insert_analysis(
-            spec_id=spec_id,
+        # Degraded results (a soft-failed step) are saved but not reusable -
+        # without an input hash the next identical request runs again
+        if not analysis_is_complete(analysis_result, bool(contract_pages)):
+            logger.warning(
+                "[ANALYZE] Analysis incomplete, not caching it by input hash"
+            )
+            input_hash = None
+
+        # Store in database once the response is on its way
+        logger.info("[ANALYZE] Queueing analysis save...")
+        background.add_task(
+            store_analysis,
+            spec_id,
+            division,
+            analysis_result,
             job_id=spec["job_id"],
-            division_code=division,
             analysis_type="section_by_section" if use_section_analysis else "full",
-            result=analysis_result,
             processing_time_ms=analysis_result["processing_time_ms"],
+            input_hash=input_hash,
+            cross_refs_included=cross_ref_count,
         )
 
-        print(f"\n[ANALYZE] Complete! ({analysis_result['processing_time_ms']}ms)")
+        logger.info("[ANALYZE] Complete! (%sms)", analysis_result["processing_time_ms"])
         if use_section_analysis:
-            print(f"[ANALYZE] Analyzed {section_count} sections individually")
+            logger.info("[ANALYZE] Analyzed %s sections individually", section_count)
 
         return AnalyzeResponse(
             spec_id=spec_id,
             division=division,
-            pages_analyzed=len(division_pages),
+            pages_analyzed=page_count,
             cross_refs_included=cross_ref_count,
-            analysis=analysis_result,
+            analysis=analysis_response_result(analysis_result),
             processing_time_ms=analysis_result["processing_time_ms"],
         )
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[ANALYZE] ERROR: {e}")
-        import traceback
-
-        traceback.print_exc()
+        logger.exception("[ANALYZE] ERROR: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -685,11 +1060,11 @@ async def get_spec_analyses(spec_id: str, auth_user_id: str = Depends(verify_tok
     Get all saved analyses for a spec.
     Returns list of analyses with division code, timestamp, and summary.
     """
-    spec = get_spec(spec_id)
+    spec = await asyncio.to_thread(get_spec, spec_id, SPEC_STATUS_COLUMNS)
     if not spec:
         raise HTTPException(status_code=404, detail="Spec not found")
 
-    analyses = get_all_analyses(spec_id)
+    analyses = await asyncio.to_thread(get_all_analyses, spec_id)
 
     return {
         "spec_id": spec_id,
@@ -723,11 +1098,11 @@ async def get_division_analysis(
     """
     division = division.zfill(2)  # Ensure 2-digit format
 
-    spec = get_spec(spec_id)
+    spec = await asyncio.to_thread(get_spec, spec_id, SPEC_STATUS_COLUMNS)
     if not spec:
         raise HTTPException(status_code=404, detail="Spec not found")
 
-    analysis = get_analysis(spec_id, division)
+    analysis = await asyncio.to_thread(get_analysis, spec_id, division)
 
     if not analysis:
         raise HTTPException(
@@ -753,12 +1128,12 @@ async def get_division_analysis(
 @app.get("/spec/{spec_id}/divisions")
 async def get_spec_divisions(spec_id: str, auth_user_id: str = Depends(verify_token)):
     """Get all divisions found in a spec using page-level data"""
-    spec = get_spec(spec_id)
+    spec = await asyncio.to_thread(get_spec, spec_id, SPEC_STATUS_COLUMNS)
     if not spec:
         raise HTTPException(status_code=404, detail="Spec not found")
 
-    # Get division summary from spec_pages
-    divisions = get_division_summary(spec_id)
+    # Get division summary (precomputed at parse time)
+    divisions = await asyncio.to_thread(get_division_summary, spec_id, spec)
 
     return {
         "spec_id": spec_id,
@@ -790,11 +1165,11 @@ async def get_division_related_sections(
 
     Returns sections sorted by reference count (most referenced first).
     """
-    spec = get_spec(spec_id)
+    spec = await asyncio.to_thread(get_spec, spec_id, SPEC_STATUS_COLUMNS)
     if not spec:
         raise HTTPException(status_code=404, detail="Spec not found")
 
-    related = get_related_sections(spec_id, division)
+    related = await asyncio.to_thread(get_related_sections, spec_id, division)
 
     return {
         "spec_id": spec_id,
@@ -826,26 +1201,24 @@ async def delete_job_endpoint(
     if user_id != auth_user_id:
         raise HTTPException(status_code=403, detail="User ID mismatch")
 
-    print(f"\n{'=' * 50}")
-    print(f"[DELETE] Deleting job: {job_id}")
-    print(f"[DELETE] User: {user_id}")
-    print(f"{'=' * 50}\n")
+    logger.info("[DELETE] Deleting job: %s", job_id)
+    logger.debug("[DELETE] User: %s", user_id)
 
     try:
-        success = delete_job(job_id, user_id)
+        success = await delete_job(job_id, user_id)
 
         if not success:
             raise HTTPException(
                 status_code=404, detail="Job not found or not owned by this user"
             )
 
-        print(f"[DELETE] Successfully deleted job {job_id}")
+        logger.info("[DELETE] Successfully deleted job %s", job_id)
         return {"status": "deleted", "job_id": job_id}
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[DELETE] ERROR: {e}")
+        logger.error("[DELETE] ERROR: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -875,46 +1248,24 @@ async def upload_submittal(
     Stores in R2 at submittals/{item_id}/{timestamp}_{filename}
     Accepts: PDF, Word, Excel, RTF, images, and other common file types.
     """
-    print(f"\n[SUBMITTAL] Upload request for item: {item_id}")
-    print(f"[SUBMITTAL] File: {file.filename}")
+    logger.info("[SUBMITTAL] Upload request for item: %s", item_id)
+    logger.debug("[SUBMITTAL] File: %s", file.filename)
 
     # Get file extension and validate it's a supported type
-    allowed_extensions = {
-        ".pdf",
-        ".doc",
-        ".docx",
-        ".xls",
-        ".xlsx",
-        ".rtf",
-        ".txt",
-        ".jpg",
-        ".jpeg",
-        ".png",
-        ".gif",
-        ".tif",
-        ".tiff",
-        ".bmp",
-        ".csv",
-        ".ppt",
-        ".pptx",
-        ".odt",
-        ".ods",
-        ".odp",
-    }
-
-    import os
-
     ext = os.path.splitext(file.filename.lower())[1]
-    if ext not in allowed_extensions:
+    if ext not in SUBMITTAL_EXTENSIONS:
         raise HTTPException(
             status_code=400,
             detail=f"File type '{ext}' not supported. Allowed: PDF, Word, Excel, RTF, images, etc.",
         )
 
     try:
-        file_bytes = await file.read()
-        file_size = len(file_bytes)
-        print(f"[SUBMITTAL] File size: {file_size:,} bytes")
+        # Streamed to R2 from the spooled upload, like /upload
+        file_size = file.size
+        if file_size is None:
+            file_size = file.file.seek(0, os.SEEK_END)
+        file.file.seek(0)
+        logger.info("[SUBMITTAL] File size: %s bytes", file_size)
 
         # Enforce 100MB size limit
         if file_size > 100 * 1024 * 1024:
@@ -922,8 +1273,10 @@ async def upload_submittal(
                 status_code=413, detail="File too large. Maximum size is 100MB."
             )
 
-        r2_key = upload_submittal_file(item_id, file.filename, file_bytes)
-        print(f"[SUBMITTAL] Uploaded to R2: {r2_key}")
+        r2_key = await asyncio.to_thread(
+            upload_submittal_file, item_id, file.filename, file.file
+        )
+        logger.info("[SUBMITTAL] Uploaded to R2: %s", r2_key)
 
         return SubmittalUploadResponse(
             r2_key=r2_key,
@@ -932,7 +1285,7 @@ async def upload_submittal(
         )
 
     except Exception as e:
-        print(f"[SUBMITTAL] Upload ERROR: {e}")
+        logger.error("[SUBMITTAL] Upload ERROR: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -942,50 +1295,32 @@ async def download_submittal(r2_key: str, auth_user_id: str = Depends(verify_tok
     Download a submittal file from R2.
     Returns the file as an attachment.
     """
-    print(f"[SUBMITTAL] Download request: {r2_key}")
-
-    # MIME type mapping
-    mime_types = {
-        ".pdf": "application/pdf",
-        ".doc": "application/msword",
-        ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        ".xls": "application/vnd.ms-excel",
-        ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        ".rtf": "application/rtf",
-        ".txt": "text/plain",
-        ".csv": "text/csv",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".png": "image/png",
-        ".gif": "image/gif",
-        ".tif": "image/tiff",
-        ".tiff": "image/tiff",
-        ".bmp": "image/bmp",
-        ".ppt": "application/vnd.ms-powerpoint",
-        ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
-        ".odt": "application/vnd.oasis.opendocument.text",
-        ".ods": "application/vnd.oasis.opendocument.spreadsheet",
-        ".odp": "application/vnd.oasis.opendocument.presentation",
-    }
+    logger.info("[SUBMITTAL] Download request: %s", r2_key)
 
     try:
-        file_bytes = download_submittal_file(r2_key)
+        # Streamed from R2 in chunks rather than buffered whole
+        chunks, content_length = await asyncio.to_thread(
+            download_submittal_file_stream, r2_key
+        )
 
         # Extract filename from r2_key and determine MIME type
         filename = r2_key.split("/")[-1]
         ext = os.path.splitext(filename.lower())[1]
-        content_type = mime_types.get(ext, "application/octet-stream")
+        content_type = SUBMITTAL_MIME_TYPES.get(ext, "application/octet-stream")
 
-        from fastapi.responses import Response
+        from fastapi.responses import StreamingResponse
 
-        return Response(
-            content=file_bytes,
+        return StreamingResponse(
+            chunks,
             media_type=content_type,
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "Content-Length": str(content_length),
+            },
         )
 
     except Exception as e:
-        print(f"[SUBMITTAL] Download ERROR: {e}")
+        logger.error("[SUBMITTAL] Download ERROR: %s", e)
         raise HTTPException(status_code=404, detail="File not found")
 
 
@@ -995,20 +1330,24 @@ async def get_submittal_file(r2_key: str, auth_user_id: str = Depends(verify_tok
     Get raw PDF bytes for a submittal file (used for PDF merging).
     Returns the file inline without Content-Disposition header.
     """
-    print(f"[SUBMITTAL] File request: {r2_key}")
+    logger.info("[SUBMITTAL] File request: %s", r2_key)
 
     try:
-        pdf_bytes = download_submittal_file(r2_key)
+        # Streamed from R2 in chunks rather than buffered whole
+        chunks, content_length = await asyncio.to_thread(
+            download_submittal_file_stream, r2_key
+        )
 
-        from fastapi.responses import Response
+        from fastapi.responses import StreamingResponse
 
-        return Response(
-            content=pdf_bytes,
+        return StreamingResponse(
+            chunks,
             media_type="application/pdf",
+            headers={"Content-Length": str(content_length)},
         )
 
     except Exception as e:
-        print(f"[SUBMITTAL] File ERROR: {e}")
+        logger.error("[SUBMITTAL] File ERROR: %s", e)
         raise HTTPException(status_code=404, detail="File not found")
 
 
@@ -1019,13 +1358,13 @@ async def delete_submittal(
     """
     Delete a submittal PDF file from R2.
     """
-    print(f"[SUBMITTAL] Delete request: {request.r2_key}")
+    logger.info("[SUBMITTAL] Delete request: %s", request.r2_key)
 
     try:
-        success = delete_submittal_file(request.r2_key)
+        success = await asyncio.to_thread(delete_submittal_file, request.r2_key)
 
         if success:
-            print(f"[SUBMITTAL] Deleted: {request.r2_key}")
+            logger.info("[SUBMITTAL] Deleted: %s", request.r2_key)
             return {"status": "deleted", "r2_key": request.r2_key}
         else:
             raise HTTPException(status_code=500, detail="Failed to delete file")
@@ -1033,7 +1372,7 @@ async def delete_submittal(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[SUBMITTAL] Delete ERROR: {e}")
+        logger.error("[SUBMITTAL] Delete ERROR: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1057,29 +1396,8 @@ class ExtractSubmittalsResponse(BaseModel):
     error: Optional[str] = None
 
 
-@app.post("/extract-submittals", response_model=ExtractSubmittalsResponse)
-async def extract_submittals(
-    request: ExtractSubmittalsRequest, auth_user_id: str = Depends(verify_token)
-):
-    """
-    Extract submittal items from analysis text using Gemini AI.
-    Returns structured list of items requiring submittals.
-    """
-    import json
-
-    import httpx
-
-    print(f"[SUBMITTALS] Extract request, text length: {len(request.text)}")
-
-    if not request.text:
-        return ExtractSubmittalsResponse(items=[], error="No text provided")
-
-    gemini_api_key = os.getenv("GEMINI_API_KEY")
-    if not gemini_api_key:
-        print("[SUBMITTALS] ERROR: GEMINI_API_KEY not configured")
-        return ExtractSubmittalsResponse(items=[], error="AI service not configured")
-
-    prompt = f"""Extract ONLY physical materials and products requiring submittals from this construction spec analysis.
+# Submittal extraction prompt, filled with str.format per call
+SUBMITTAL_EXTRACT_TEMPLATE = """Extract ONLY physical materials and products requiring submittals from this construction spec analysis.
 Return ONLY a valid JSON array, no other text or markdown formatting:
 
 [{{"spec_section": "04 20 00", "description": "Item name", "manufacturer": "Manufacturer or empty string"}}]
@@ -1110,19 +1428,115 @@ Important:
 - manufacturer should be the company name, or empty string if unknown
 
 Analysis text:
-{request.text}"""
+{text}"""
+
+# Successful extractions keyed by SHA-256 of model + filled prompt, so
+# re-submitting the same analysis text (retries, re-opened jobs) skips Gemini
+SUBMITTAL_CACHE_TTL = 24 * 60 * 60  # seconds
+SUBMITTAL_CACHE_MAX = 512
+_submittal_cache: dict = {}
 
-    try:
-        from analyzer import gemini_request_with_retry
 
+def normalize_analysis_text(text: str) -> str:
+    """
+    Collapse whitespace-only differences (indentation, trailing spaces, runs
+    of blank lines, CRLF) so re-copied analysis text maps to the same prompt
+    and cache key. Line breaks are kept - headings and lists carry meaning.
+    """
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+# Analysis text sent for submittal extraction is capped at this many chars
+# (~8k tokens); the item lists live in the first part of the summaries
+SUBMITTAL_TEXT_MAX_CHARS = 32000
+
+# Lists/headings of the administrative items the prompt excludes anyway -
+# dropped first when a text is over the cap
+SUBMITTAL_ADMIN_LINE_RE = re.compile(
+    r"^[\s\-*•#\d.)]*(?:certificates?|meeting minutes|progress reports?|"
+    r"payment applications?|change orders?|substitution requests?|"
+    r"closeout|warrant(?:y|ies)|o&m|operation and maintenance|as-builts?|"
+    r"record drawings|leed|commissioning|test reports?|inspection reports?|"
+    r"mock-?ups?|(?:preliminary|full|updated|construction|cpm) schedules?|"
+    r"request logs?|proposal requests?)",
+    re.IGNORECASE,
+)
+
+
+def submittal_prompt(text: str) -> str:
+    """
+    Fill the extraction prompt from normalized analysis text. Over-budget
+    text loses administrative lines, then is cut on a paragraph/line boundary.
+    """
+    text = normalize_analysis_text(text)
+    if len(text) > SUBMITTAL_TEXT_MAX_CHARS:
+        original_len = len(text)
+        text = "\n".join(
+            line for line in text.split("\n") if not SUBMITTAL_ADMIN_LINE_RE.match(line)
+        )
+        text = truncate_text(text, SUBMITTAL_TEXT_MAX_CHARS)
+        logger.info(
+            "[SUBMITTALS] Pruned analysis text: %s -> %s chars",
+            original_len,
+            len(text),
+        )
+    return SUBMITTAL_EXTRACT_TEMPLATE.format(text=text)
+
+
+# Gemini structured output: replies are constrained to a JSON array of
+# SubmittalItem objects (Gemini's OpenAPI-style schema, all fields strings)
+SUBMITTAL_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {name: {"type": "STRING"} for name in SubmittalItem.model_fields},
+        "required": list(SubmittalItem.model_fields),
+    },
+}
+_submittal_items_adapter = TypeAdapter(List[SubmittalItem])
+
+
+def submittal_extract_payload(prompt: str) -> dict:
+    """Gemini request body for a submittal extraction"""
+    return {
+        "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+        "generationConfig": {
+            "temperature": 0.1,
+            "maxOutputTokens": 2048,
+            "responseMimeType": "application/json",
+            "responseSchema": SUBMITTAL_RESPONSE_SCHEMA,
+        },
+    }
+
+
+def to_submittal_item(item: dict) -> SubmittalItem:
+    """Coerce one extracted item into a SubmittalItem"""
+    return SubmittalItem(
+        spec_section=str(item.get("spec_section", "")),
+        description=str(item.get("description", "Unknown Item")),
+        manufacturer=str(item.get("manufacturer", "")),
+    )
+
+
+# Replies that aren't a JSON array of items are sent back to Gemini with the
+# error and re-requested, at most this many times
+SUBMITTAL_JSON_RETRIES = 2
+
+
+async def request_submittal_items(prompt: str) -> List[SubmittalItem]:
+    """
+    Run a submittal extraction, re-prompting with the parse error when the
+    reply doesn't validate as a list of SubmittalItem (after 1s, then 2s).
+    Raises pydantic's ValidationError once the retries are used up.
+    """
+    from analyzer import gemini_request_with_retry
+
+    payload = submittal_extract_payload(prompt)
+
+    for attempt in range(SUBMITTAL_JSON_RETRIES + 1):
         result = await gemini_request_with_retry(
-            payload={
-                "contents": [{"parts": [{"text": prompt}]}],
-                "generationConfig": {
-                    "temperature": 0.1,
-                    "maxOutputTokens": 2048,
-                },
-            },
+            payload=payload,
             timeout=60.0,
             label="SUBMITTALS",
         )
@@ -1135,67 +1549,239 @@ Analysis text:
             .strip()
         )
 
-        print(f"[SUBMITTALS] Raw AI response: {result_text[:500]}")
+        logger.debug("[SUBMITTALS] Raw AI response: %s", result_text[:500])
+
+        try:
+            # Schema-constrained output is bare JSON - parse and validate in one go
+            return _submittal_items_adapter.validate_json(result_text)
+        except ValidationError as e:
+            if attempt == SUBMITTAL_JSON_RETRIES:
+                raise
+            logger.warning(
+                "[SUBMITTALS] Invalid JSON reply (%s), re-prompting (attempt %s/%s)",
+                e,
+                attempt + 1,
+                SUBMITTAL_JSON_RETRIES,
+            )
+            payload["contents"] += [
+                {"role": "model", "parts": [{"text": result_text}]},
+                {
+                    "role": "user",
+                    "parts": [
+                        {
+                            "text": f"Your output had error: {e}. "
+                            "Return ONLY a valid JSON array."
+                        }
+                    ],
+                },
+            ]
+            await asyncio.sleep(1.0 * (attempt + 1))
+
+
+def cache_submittal_items(cache_key: str, items: List[SubmittalItem]) -> None:
+    """Store an extraction result; evicts the oldest entry when full"""
+    _submittal_cache.pop(cache_key, None)
+    if len(_submittal_cache) >= SUBMITTAL_CACHE_MAX:
+        _submittal_cache.pop(next(iter(_submittal_cache)))
+    _submittal_cache[cache_key] = {
+        "items": items,
+        "expires": time.time() + SUBMITTAL_CACHE_TTL,
+    }
+
 
-        # Clean up response - remove markdown code blocks if present
-        if result_text.startswith("```"):
-            result_text = result_text.split("\n", 1)[1]
-            result_text = result_text.rsplit("```", 1)[0]
+def get_cached_submittal_items(cache_key: str) -> Optional[List[SubmittalItem]]:
+    """Cached extraction result, if present and not expired"""
+    cached = _submittal_cache.get(cache_key)
+    if cached and cached["expires"] > time.time():
+        return cached["items"]
+    return None
 
-        # Also handle ```json prefix
-        if result_text.startswith("json"):
-            result_text = result_text[4:].strip()
 
-        items = json.loads(result_text)
-        print(f"[SUBMITTALS] Extracted {len(items)} items")
+async def extract_submittals_for_text(text: str) -> ExtractSubmittalsResponse:
+    """
+    Extract submittal items from one analysis text (cached by content hash).
+    Failures are reported in the response's error field, not raised.
+    """
+    logger.info("[SUBMITTALS] Extract request, text length: %s", len(text))
 
-        # Validate and convert to proper format
-        valid_items = []
-        for item in items:
-            valid_items.append(
-                SubmittalItem(
-                    spec_section=str(item.get("spec_section", "")),
-                    description=str(item.get("description", "Unknown Item")),
-                    manufacturer=str(item.get("manufacturer", "")),
-                )
-            )
+    if not text:
+        return ExtractSubmittalsResponse(items=[], error="No text provided")
+
+    gemini_api_key = os.getenv("GEMINI_API_KEY")
+    if not gemini_api_key:
+        logger.error("[SUBMITTALS] ERROR: GEMINI_API_KEY not configured")
+        return ExtractSubmittalsResponse(items=[], error="AI service not configured")
+
+    # Gemini sees the normalized text too, so a cache hit is exactly the
+    # request that produced it
+    prompt = submittal_prompt(text)
+
+    cache_key = hashlib.sha256(orjson.dumps([GEMINI_API_URL, prompt])).hexdigest()
+    cached = get_cached_submittal_items(cache_key)
+    if cached is not None:
+        logger.info("[SUBMITTALS] Cache hit, %s items", len(cached))
+        return ExtractSubmittalsResponse(items=cached)
+
+    try:
+        valid_items = await request_submittal_items(prompt)
+        logger.info("[SUBMITTALS] Extracted %s items", len(valid_items))
+
+        # Only successful (possibly re-prompted) results are cached
+        cache_submittal_items(cache_key, valid_items)
 
         return ExtractSubmittalsResponse(items=valid_items)
 
-    except json.JSONDecodeError as e:
-        print(f"[SUBMITTALS] JSON parse error: {e}")
+    except ValidationError as e:
+        logger.error("[SUBMITTALS] JSON parse error: %s", e)
         return ExtractSubmittalsResponse(items=[], error="Failed to parse AI response")
     except Exception as e:
-        print(f"[SUBMITTALS] Error: {e}")
+        logger.error("[SUBMITTALS] Error: %s", e)
         return ExtractSubmittalsResponse(items=[], error=str(e))
 
 
-# ═══════════════════════════════════════════════════════════════
-# FILE CONVERSION (for submittal package PDF merging)
-# ═══════════════════════════════════════════════════════════════
+@app.post("/extract-submittals", response_model=ExtractSubmittalsResponse)
+async def extract_submittals(
+    request: ExtractSubmittalsRequest, auth_user_id: str = Depends(verify_token)
+):
+    """
+    Extract submittal items from analysis text using Gemini AI.
+    Returns structured list of items requiring submittals.
+    """
+    return await extract_submittals_for_text(request.text)
 
 
-@app.get("/submittal/file-as-pdf/{r2_key:path}")
-async def get_submittal_file_as_pdf(
-    r2_key: str, auth_user_id: str = Depends(verify_token)
+# Upper bound on texts per /extract-submittals/batch call
+SUBMITTAL_BATCH_MAX = 20
+
+
+@app.post("/extract-submittals/batch", response_model=List[ExtractSubmittalsResponse])
+async def extract_submittals_batch(
+    requests: List[ExtractSubmittalsRequest],
+    auth_user_id: str = Depends(verify_token),
 ):
     """
-    Get a submittal file as PDF. If it's already a PDF, return as-is.
-    If it's a convertible format (doc, docx, rtf, etc.), convert to PDF first.
-    Uses LibreOffice for conversion on supported systems.
+    Extract submittal items from several analysis texts in one call.
+    Texts are extracted concurrently (the shared Gemini semaphore caps
+    in-flight requests); identical texts are only extracted once.
+    Returns one response per text, in input order.
     """
-    import shutil
-    import subprocess
-    import tempfile
+    if len(requests) > SUBMITTAL_BATCH_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many texts. Maximum is {SUBMITTAL_BATCH_MAX} per batch.",
+        )
 
-    print(f"[SUBMITTAL] File-as-PDF request: {r2_key}")
+    logger.info("[SUBMITTALS] Batch extract request, %s texts", len(requests))
+
+    unique_texts = list(dict.fromkeys(request.text for request in requests))
+    responses = await asyncio.gather(
+        *(extract_submittals_for_text(text) for text in unique_texts)
+    )
+    by_text = dict(zip(unique_texts, responses))
+    return [by_text[request.text] for request in requests]
+
+
+def sse_event(data: dict, event: Optional[str] = None) -> bytes:
+    """One Server-Sent Events message"""
+    prefix = f"event: {event}\n".encode() if event else b""
+    return prefix + b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+@app.post("/extract-submittals/stream")
+async def extract_submittals_stream(
+    request: ExtractSubmittalsRequest, auth_user_id: str = Depends(verify_token)
+):
+    """
+    Streaming variant of /extract-submittals (Server-Sent Events).
+    Sends one `data: {item}` message per submittal item as Gemini generates
+    it, then `event: done` with the item count, or `event: error`.
+    Shares the extraction cache with /extract-submittals.
+    """
+    from fastapi.responses import StreamingResponse
+
+    from analyzer import JsonArrayItemParser, gemini_stream_text
+
+    logger.info(
+        "[SUBMITTALS] Stream extract request, text length: %s", len(request.text)
+    )
+
+    async def events():
+        if not request.text:
+            yield sse_event({"error": "No text provided"}, event="error")
+            return
+        if not os.getenv("GEMINI_API_KEY"):
+            logger.error("[SUBMITTALS] ERROR: GEMINI_API_KEY not configured")
+            yield sse_event({"error": "AI service not configured"}, event="error")
+            return
+
+        prompt = submittal_prompt(request.text)
+        cache_key = hashlib.sha256(orjson.dumps([GEMINI_API_URL, prompt])).hexdigest()
+
+        cached = get_cached_submittal_items(cache_key)
+        if cached is not None:
+            logger.info("[SUBMITTALS] Cache hit, %s items", len(cached))
+            for item in cached:
+                yield sse_event(item.model_dump())
+            yield sse_event({"count": len(cached)}, event="done")
+            return
+
+        items = []
+        dropped = 0  # non-object elements
+        parser = JsonArrayItemParser()
+        try:
+            async for text in gemini_stream_text(
+                payload=submittal_extract_payload(prompt),
+                timeout=60.0,
+                label="SUBMITTALS",
+            ):
+                for raw in parser.feed(text):
+                    if not isinstance(raw, dict):
+                        dropped += 1
+                        continue
+                    item = to_submittal_item(raw)
+                    items.append(item)
+                    yield sse_event(item.model_dump())
+        except Exception as e:
+            logger.error("[SUBMITTALS] Stream error: %s", e)
+            yield sse_event({"error": str(e)}, event="error")
+            return
+
+        # Cut-off output (MAX_TOKENS), prose replies or dropped elements mean
+        # the items sent are partial - report it and keep them out of the cache
+        skipped = parser.skipped + dropped
+        if not parser.complete or skipped:
+            logger.error(
+                "[SUBMITTALS] Incomplete stream: %s items, array closed: %s, "
+                "%s elements skipped",
+                len(items),
+                parser.complete,
+                skipped,
+            )
+            yield sse_event(
+                {"error": "Incomplete AI response", "count": len(items)},
+                event="error",
+            )
+            return
+
+        logger.info("[SUBMITTALS] Streamed %s items", len(items))
+        cache_submittal_items(cache_key, items)
+        yield sse_event({"count": len(items)}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    # Extract filename and extension
-    filename = r2_key.split("/")[-1]
-    ext = os.path.splitext(filename.lower())[1]
 
-    # Convertible extensions
-    convertible_extensions = {
+# ═══════════════════════════════════════════════════════════════
+# FILE CONVERSION (for submittal package PDF merging)
+# ═══════════════════════════════════════════════════════════════
+
+
+# Converted to PDF via LibreOffice
+CONVERTIBLE_EXTENSIONS = frozenset(
+    {
         ".doc",
         ".docx",
         ".rtf",
@@ -1209,36 +1795,195 @@ async def get_submittal_file_as_pdf(
         ".pptx",
         ".odp",
     }
+)
+
+# Converted to PDF via Pillow
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".gif", ".tif", ".tiff", ".bmp"})
+
+# Conversions run in worker threads (LibreOffice in its own process); cap how
+# many run at once so a package merge can't spawn a soffice per file
+MAX_CONCURRENT_CONVERSIONS = int(
+    os.getenv("MAX_CONCURRENT_CONVERSIONS", str(os.cpu_count() or 2))
+)
+_convert_semaphore = asyncio.Semaphore(MAX_CONCURRENT_CONVERSIONS)
+
+# One LibreOffice profile per conversion slot, reused across runs: a warm
+# profile skips soffice's first-run setup, and concurrent soffice processes
+# must never share one (they fail on its lock)
+LIBREOFFICE_PROFILE_ROOT = os.path.join(tempfile.gettempdir(), "lo-profiles")
+_libreoffice_profiles: queue.Queue = queue.Queue()
+for _slot in range(MAX_CONCURRENT_CONVERSIONS):
+    _libreoffice_profiles.put(os.path.join(LIBREOFFICE_PROFILE_ROOT, f"slot{_slot}"))
+
+# Converted PDFs are built in a spooled temp file - in memory up to this
+# size, on disk beyond it - and streamed to the client from there
+CONVERTED_PDF_SPOOL_SIZE = 8 * 1024 * 1024
+
+
+# Converted PDFs are kept on disk keyed by SHA-256 of the source bytes +
+# extension, so re-assembling a package doesn't re-run the conversions.
+# Least recently served files are removed beyond the cap.
+CONVERTED_PDF_CACHE_DIR = os.getenv(
+    "CONVERTED_PDF_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "converted-pdf-cache"),
+)
+CONVERTED_PDF_CACHE_MAX_FILES = 256
 
-    # Image extensions (convert via different method)
-    image_extensions = {".jpg", ".jpeg", ".png", ".gif", ".tif", ".tiff", ".bmp"}
 
+def converted_pdf_digest(file_bytes: bytes, ext: str) -> str:
+    """Cache key for a converted PDF"""
+    digest = hashlib.sha256(file_bytes)
+    digest.update(ext.encode())
+    return digest.hexdigest()
+
+
+def get_cached_converted_pdf(digest: str) -> Optional[str]:
+    """Path of a cached converted PDF, if present (marks it recently used)"""
+    path = os.path.join(CONVERTED_PDF_CACHE_DIR, f"{digest}.pdf")
+    try:
+        os.utime(path)
+    except OSError:
+        return None
+    return path
+
+
+def store_converted_pdf(digest: str, pdf_file: BinaryIO) -> str:
+    """
+    Write a converted PDF into the cache (atomically, via os.replace) and
+    prune the oldest entries past CONVERTED_PDF_CACHE_MAX_FILES.
+    Returns the cached path. pdf_file is left open; on failure the partial
+    temp file is removed and pdf_file is rewound so the caller can still
+    stream it.
+    """
+    os.makedirs(CONVERTED_PDF_CACHE_DIR, exist_ok=True)
+    path = os.path.join(CONVERTED_PDF_CACHE_DIR, f"{digest}.pdf")
+
+    tmp = tempfile.NamedTemporaryFile(
+        dir=CONVERTED_PDF_CACHE_DIR, suffix=".tmp", delete=False
+    )
     try:
-        file_bytes = download_submittal_file(r2_key)
+        with tmp:
+            shutil.copyfileobj(pdf_file, tmp)
+        os.replace(tmp.name, path)
+    except OSError:
+        try:
+            os.remove(tmp.name)
+        except OSError:
+            pass
+        pdf_file.seek(0)
+        raise
+
+    # Pruning is best-effort - the PDF is already in place
+    try:
+        entries = [
+            entry
+            for entry in os.scandir(CONVERTED_PDF_CACHE_DIR)
+            if entry.name.endswith(".pdf")
+        ]
+        if len(entries) > CONVERTED_PDF_CACHE_MAX_FILES:
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[: len(entries) - CONVERTED_PDF_CACHE_MAX_FILES]:
+                os.remove(entry.path)
+    except OSError as e:
+        logger.warning("[SUBMITTAL] Converted PDF cache prune failed: %s", e)
+
+    return path
+
 
-        # If already PDF, return as-is
+async def cached_converted_pdf_response(digest: str, pdf_file: BinaryIO):
+    """Cache a freshly converted PDF and serve it; streams it if caching fails"""
+    from fastapi.responses import FileResponse
+
+    try:
+        path = await asyncio.to_thread(store_converted_pdf, digest, pdf_file)
+    except OSError as e:
+        logger.warning("[SUBMITTAL] Converted PDF cache write failed: %s", e)
+        return converted_pdf_response(pdf_file)
+    pdf_file.close()
+    return FileResponse(path, media_type="application/pdf")
+
+
+def iter_and_close(file_obj: BinaryIO) -> Iterator[bytes]:
+    """Yield a file's contents in DOWNLOAD_CHUNK_SIZE chunks, then close it"""
+    try:
+        yield from iter(lambda: file_obj.read(DOWNLOAD_CHUNK_SIZE), b"")
+    finally:
+        file_obj.close()
+
+
+def converted_pdf_response(pdf_file: BinaryIO):
+    """StreamingResponse for a converted PDF (closes the file when sent)"""
+    from fastapi.responses import StreamingResponse
+
+    size = pdf_file.seek(0, os.SEEK_END)
+    pdf_file.seek(0)
+    return StreamingResponse(
+        iter_and_close(pdf_file),
+        media_type="application/pdf",
+        headers={"Content-Length": str(size)},
+    )
+
+
+@app.get("/submittal/file-as-pdf/{r2_key:path}")
+async def get_submittal_file_as_pdf(
+    r2_key: str, auth_user_id: str = Depends(verify_token)
+):
+    """
+    Get a submittal file as PDF. If it's already a PDF, return as-is.
+    If it's a convertible format (doc, docx, rtf, etc.), convert to PDF first.
+    Uses LibreOffice for conversion on supported systems.
+    """
+    logger.info("[SUBMITTAL] File-as-PDF request: %s", r2_key)
+
+    # Extract filename and extension
+    filename = r2_key.split("/")[-1]
+    ext = os.path.splitext(filename.lower())[1]
+
+    try:
+        # If already PDF, stream it through from R2 as-is
         if ext == ".pdf":
-            from fastapi.responses import Response
+            from fastapi.responses import StreamingResponse
 
-            return Response(content=file_bytes, media_type="application/pdf")
+            chunks, content_length = await asyncio.to_thread(
+                download_submittal_file_stream, r2_key
+            )
+            return StreamingResponse(
+                chunks,
+                media_type="application/pdf",
+                headers={"Content-Length": str(content_length)},
+            )
 
-        # Handle image files
-        if ext in image_extensions:
-            pdf_bytes = convert_image_to_pdf(file_bytes, ext)
-            if pdf_bytes:
-                from fastapi.responses import Response
+        file_bytes = await asyncio.to_thread(download_submittal_file, r2_key)
+
+        # Same bytes converted before - serve the cached PDF
+        if ext in IMAGE_EXTENSIONS or ext in CONVERTIBLE_EXTENSIONS:
+            digest = converted_pdf_digest(file_bytes, ext)
+            cached_path = await asyncio.to_thread(get_cached_converted_pdf, digest)
+            if cached_path:
+                from fastapi.responses import FileResponse
 
-                return Response(content=pdf_bytes, media_type="application/pdf")
+                logger.info("[SUBMITTAL] Converted PDF cache hit: %s", digest[:12])
+                return FileResponse(cached_path, media_type="application/pdf")
+
+        # Handle image files
+        if ext in IMAGE_EXTENSIONS:
+            async with _convert_semaphore:
+                pdf_file = await asyncio.to_thread(
+                    convert_image_to_pdf, file_bytes, ext
+                )
+            if pdf_file:
+                return await cached_converted_pdf_response(digest, pdf_file)
             else:
                 raise HTTPException(status_code=500, detail="Image conversion failed")
 
-        # Handle document files via LibreOffice
-        if ext in convertible_extensions:
-            pdf_bytes = convert_document_to_pdf(file_bytes, filename)
-            if pdf_bytes:
-                from fastapi.responses import Response
-
-                return Response(content=pdf_bytes, media_type="application/pdf")
+        # Handle document files via LibreOffice (blocks for seconds - off the loop)
+        if ext in CONVERTIBLE_EXTENSIONS:
+            async with _convert_semaphore:
+                pdf_file = await asyncio.to_thread(
+                    convert_document_to_pdf, file_bytes, filename
+                )
+            if pdf_file:
+                return await cached_converted_pdf_response(digest, pdf_file)
             else:
                 raise HTTPException(
                     status_code=500, detail=f"Document conversion failed for {ext} file"
@@ -1252,12 +1997,15 @@ async def get_submittal_file_as_pdf(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[SUBMITTAL] File-as-PDF ERROR: {e}")
+        logger.error("[SUBMITTAL] File-as-PDF ERROR: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def convert_image_to_pdf(image_bytes: bytes, ext: str) -> Optional[bytes]:
-    """Convert an image to PDF using PIL/Pillow."""
+def convert_image_to_pdf(image_bytes: bytes, ext: str) -> Optional[BinaryIO]:
+    """
+    Convert an image to PDF using PIL/Pillow.
+    Returns the PDF as a spooled temp file, rewound.
+    """
     try:
         from io import BytesIO
 
@@ -1277,31 +2025,28 @@ def convert_image_to_pdf(image_bytes: bytes, ext: str) -> Optional[bytes]:
             img = img.convert("RGB")
 
         # Save as PDF
-        pdf_buffer = BytesIO()
-        img.save(pdf_buffer, format="PDF", resolution=100.0)
-        pdf_buffer.seek(0)
+        pdf_file = tempfile.SpooledTemporaryFile(max_size=CONVERTED_PDF_SPOOL_SIZE)
+        img.save(pdf_file, format="PDF", resolution=100.0)
 
-        print(
-            f"[SUBMITTAL] Converted image to PDF ({len(pdf_buffer.getvalue())} bytes)"
-        )
-        return pdf_buffer.getvalue()
+        logger.info("[SUBMITTAL] Converted image to PDF (%s bytes)", pdf_file.tell())
+        pdf_file.seek(0)
+        return pdf_file
 
     except Exception as e:
-        print(f"[SUBMITTAL] Image conversion error: {e}")
+        logger.error("[SUBMITTAL] Image conversion error: %s", e)
         return None
 
 
-def convert_document_to_pdf(doc_bytes: bytes, filename: str) -> Optional[bytes]:
-    """Convert a document to PDF using LibreOffice headless."""
-    import shutil
-    import subprocess
-    import tempfile
-
+def convert_document_to_pdf(doc_bytes: bytes, filename: str) -> Optional[BinaryIO]:
+    """
+    Convert a document to PDF using LibreOffice headless.
+    Returns the PDF as a spooled temp file, rewound.
+    """
     # Check if LibreOffice is available
     libreoffice_path = shutil.which("libreoffice") or shutil.which("soffice")
 
     if not libreoffice_path:
-        print("[SUBMITTAL] LibreOffice not found, cannot convert document")
+        logger.warning("[SUBMITTAL] LibreOffice not found, cannot convert document")
         return None
 
     try:
@@ -1312,25 +2057,33 @@ def convert_document_to_pdf(doc_bytes: bytes, filename: str) -> Optional[bytes]:
             with open(input_path, "wb") as f:
                 f.write(doc_bytes)
 
-            # Run LibreOffice conversion
-            result = subprocess.run(
-                [
-                    libreoffice_path,
-                    "--headless",
-                    "--convert-to",
-                    "pdf",
-                    "--outdir",
-                    tmpdir,
-                    "--outdir",
-                    tmpdir,
-                    input_path,
-                ],
-                capture_output=True,
-                timeout=60,  # 60 second timeout
-            )
+            # Run LibreOffice conversion on a free profile slot (callers hold
+            # _convert_semaphore, so one is always available)
+            profile_dir = _libreoffice_profiles.get()
+            try:
+                result = subprocess.run(
+                    [
+                        libreoffice_path,
+                        f"-env:UserInstallation={Path(profile_dir).as_uri()}",
+                        "--headless",
+                        "--convert-to",
+                        "pdf",
+                        "--outdir",
+                        tmpdir,
+                        "--outdir",
+                        tmpdir,
+                        input_path,
+                    ],
+                    capture_output=True,
+                    timeout=60,  # 60 second timeout
+                )
+            finally:
+                _libreoffice_profiles.put(profile_dir)
 
             if result.returncode != 0:
-                print(f"[SUBMITTAL] LibreOffice error: {result.stderr.decode()}")
+                logger.error(
+                    "[SUBMITTAL] LibreOffice error: %s", result.stderr.decode()
+                )
                 return None
 
             # Find the output PDF
@@ -1338,21 +2091,25 @@ def convert_document_to_pdf(doc_bytes: bytes, filename: str) -> Optional[bytes]:
             output_path = os.path.join(tmpdir, f"{base_name}.pdf")
 
             if not os.path.exists(output_path):
-                print(f"[SUBMITTAL] Output PDF not found at {output_path}")
+                logger.warning("[SUBMITTAL] Output PDF not found at %s", output_path)
                 return None
 
-            # Read and return the PDF
+            # Move the PDF out before the temp dir is removed
+            pdf_file = tempfile.SpooledTemporaryFile(max_size=CONVERTED_PDF_SPOOL_SIZE)
             with open(output_path, "rb") as f:
-                pdf_bytes = f.read()
+                shutil.copyfileobj(f, pdf_file)
 
-            print(f"[SUBMITTAL] Converted document to PDF ({len(pdf_bytes)} bytes)")
-            return pdf_bytes
+            logger.info(
+                "[SUBMITTAL] Converted document to PDF (%s bytes)", pdf_file.tell()
+            )
+            pdf_file.seek(0)
+            return pdf_file
 
     except subprocess.TimeoutExpired:
-        print("[SUBMITTAL] LibreOffice conversion timed out")
+        logger.warning("[SUBMITTAL] LibreOffice conversion timed out")
         return None
     except Exception as e:
-        print(f"[SUBMITTAL] Document conversion error: {e}")
+        logger.error("[SUBMITTAL] Document conversion error: %s", e)
         return None
 
 
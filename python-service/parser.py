@@ -16,13 +16,24 @@ The classification_method field tracks which tier was used:
 """
 
 import gc
-import json
+import hashlib
+import logging
+import multiprocessing
 import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from typing import Any, Dict, List, Optional, Tuple
 
 import fitz  # PyMuPDF
 import httpx
+import orjson
+
+from analyzer import extract_json
+
+# Child of main.py's "spec_analyzer" logger, which owns the queued handler
+logger = logging.getLogger("spec_analyzer.parser")
 
 # Gemini API for AI fallback classification
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -33,44 +44,52 @@ GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini
 # ═══════════════════════════════════════════════════════════════
 
 # Valid CSI MasterFormat division codes
-VALID_DIVISIONS = {
-    "00",
-    "01",
-    "02",
-    "03",
-    "04",
-    "05",
-    "06",
-    "07",
-    "08",
-    "09",
-    "10",
-    "11",
-    "12",
-    "13",
-    "14",
-    "21",
-    "22",
-    "23",
-    "25",
-    "26",
-    "27",
-    "28",
-    "31",
-    "32",
-    "33",
-    "34",
-    "35",
-    "40",
-    "41",
-    "42",
-    "43",
-    "44",
-    "45",
-    "46",
-    "47",
-    "48",
-}
+VALID_DIVISIONS = frozenset(
+    {
+        "00",
+        "01",
+        "02",
+        "03",
+        "04",
+        "05",
+        "06",
+        "07",
+        "08",
+        "09",
+        "10",
+        "11",
+        "12",
+        "13",
+        "14",
+        "21",
+        "22",
+        "23",
+        "25",
+        "26",
+        "27",
+        "28",
+        "31",
+        "32",
+        "33",
+        "34",
+        "35",
+        "40",
+        "41",
+        "42",
+        "43",
+        "44",
+        "45",
+        "46",
+        "47",
+        "48",
+    }
+)
+
+# Contract/general requirements divisions - never a trade division on their own
+CONTRACT_DIVISIONS = frozenset({"00", "01"})
+
+# Divisions a page header/footer can assign as its trade division
+TRADE_DIVISIONS = VALID_DIVISIONS - CONTRACT_DIVISIONS
 
 # Trade keywords for Tier 3 fallback classification
 TRADE_KEYWORDS = {
@@ -92,34 +111,232 @@ TRADE_KEYWORDS = {
     "33": ["UTILITIES", "STORM DRAINAGE", "SANITARY SEWER"],
 }
 
+# Header/footer section patterns (compiled once, used on every page)
+# Compact: 5-6 digits no spaces (04220, 042200)
+# Spaced: digits with spaces (04 22 00, 04 22 0)
+HEADER_FOOTER_PATTERNS = {
+    "compact_page": re.compile(r"(0[1-9]|[1-4]\d)(\d{3,4})\s*[-–—]\s*\d{1,3}"),
+    "spaced_page": re.compile(
+        r"(0[1-9]|[1-4]\d)\s+(\d{2})\s*(\d{2})?(?:\.(\d+))?\s*[-–—]\s*\d{1,3}"
+    ),
+    "section_compact": re.compile(r"SECTION\s+(0[1-9]|[1-4]\d)(\d{3,4})\b"),
+    "section_spaced": re.compile(
+        r"SECTION\s+(0[1-9]|[1-4]\d)\s+(\d{2})\s+(\d{2})(?:\.(\d+))?"
+    ),
+}
+
+# Format detection variants (no subsection capture, case-insensitive SECTION)
+SPEC_FORMAT_PATTERNS = {
+    "compact_page": HEADER_FOOTER_PATTERNS["compact_page"],
+    "spaced_page": re.compile(
+        r"(0[1-9]|[1-4]\d)\s+(\d{2})\s*(\d{2})?\s*[-–—]\s*\d{1,3}"
+    ),
+    "section_compact": re.compile(
+        r"SECTION\s+(0[1-9]|[1-4]\d)(\d{3,4})\b", re.IGNORECASE
+    ),
+    "section_spaced": re.compile(
+        r"SECTION\s+(0[1-9]|[1-4]\d)\s+(\d{2})\s+(\d{2})", re.IGNORECASE
+    ),
+}
+
+# Spaced footer allowing a 1-digit last group: "04 22 00 - 5" or "04 22 0 - 5"
+SPACED_FOOTER_SCAN_PATTERN = re.compile(
+    r"(0[1-9]|[1-4]\d)\s+(\d{2})\s*(\d{1,2})?(?:\.(\d+))?\s*[-–—]\s*\d{1,3}"
+)
+
+# "DIVISION XX" header (fallback for division start pages) - see find_division_header
+DIVISION_HEADER_KEYWORD = "DIVISION"
+
+# Strict footer: section number + dash + page number (with optional "/ total")
+# Matches: "03 30 00 - 12", "00 01 10 - 1 / 9"
+STRICT_FOOTER_PATTERN = re.compile(
+    r"(\d{2})\s+(\d{2})\s+(\d{2})(?:\.(\d+))?\s*[-–—]\s*(\d{1,3})(?:\s*/\s*\d+)?",
+    re.MULTILINE,
+)
+
+# "SECTION XX XX XX" in header (any division, including 00/01)
+SECTION_HEADER_PATTERN = re.compile(
+    r"SECTION\s+(\d{2})\s+(\d{2})\s+(\d{2})(?:\.(\d+))?", re.IGNORECASE
+)
+
+# TOC page header markers (applied to uppercased text). "CONTENTS" also
+# covers "TABLE OF CONTENTS", so one alternation replaces four substring scans
+TOC_HEADER_PATTERN = re.compile(r"CONTENTS|INDEX OF SPECIFICATIONS|SPECIFICATION INDEX")
+
+# Explicit TOC/index headers for is_toc_page (applied to uppercased text)
+EXPLICIT_TOC_HEADER_PATTERN = re.compile(
+    r"TABLE OF CONTENTS|INDEX OF SPECIFICATIONS|SPECIFICATION INDEX"
+)
+
+# Bare "XX YY ZZ" section number (TOC/index detection, cross-references)
+SECTION_NUMBER_PATTERN = re.compile(r"\b(\d{2})\s+(\d{2})\s+(\d{2})\b")
+
+# "Section XX YY ZZ" listings - several on one page means a TOC page
+SECTION_LISTING_PATTERN = re.compile(r"Section\s+\d{2}\s+\d{2}\s+\d{2}", re.IGNORECASE)
+
+# Section number in a PDF bookmark title
+# Matches: "031000", "03 10 00", "033000 RIB - Cast-in-Place Concrete"
+OUTLINE_SECTION_PATTERN = re.compile(r"(\d{2})\s*(\d{2})\s*(\d{2})(?:\.(\d+))?")
+
+# TOC line: section number followed eventually by a page number
+# Handles dots, dashes, spaces between section and page
+TOC_LINE_PATTERN = re.compile(
+    r"(\d{2})\s+(\d{2})\s+(\d{2})(?:\.(\d+))?"  # Section number
+    r"[^\d]*?"  # Non-digit chars (title, dots)
+    r"(\d{1,4})\s*$",  # Page number at end of line
+    re.MULTILINE,
+)
+
 
 # ═══════════════════════════════════════════════════════════════
 # TEXT UTILITIES
 # ═══════════════════════════════════════════════════════════════
 
 
+# Characters stripped from extracted text
+PROBLEMATIC_CHARS = (
+    "\x00",  # null byte - PostgreSQL can't handle these
+    "\u200b",  # zero-width space
+    "\u200c",  # zero-width non-joiner
+    "\u200d",  # zero-width joiner
+    "\ufeff",  # BOM
+    "\u00ad",  # soft hyphen
+)
+
+
 def clean_text(text: str) -> str:
     """Remove problematic Unicode characters that cause encoding issues"""
     if not text:
         return ""
 
-    # Remove null bytes first - PostgreSQL can't handle these
-    text = text.replace("\x00", "")
-    text = text.replace("\u0000", "")
-
-    # Remove other problematic characters
-    problematic = [
-        "\u200b",  # zero-width space
-        "\u200c",  # zero-width non-joiner
-        "\u200d",  # zero-width joiner
-        "\ufeff",  # BOM
-        "\u00ad",  # soft hyphen
-    ]
-    for char in problematic:
-        text = text.replace(char, "")
+    # Most pages contain none of these - the membership check is a fast scan
+    # with no allocation, so only copy the text when there's something to remove
+    for char in PROBLEMATIC_CHARS:
+        if char in text:
+            text = text.replace(char, "")
     return text
 
 
+# Pages with less text than this (ignoring surrounding whitespace) are blank
+MIN_PAGE_CHARS = 50
+
+
+def has_min_content(text: str, min_chars: int = MIN_PAGE_CHARS) -> bool:
+    """
+    Same as len(text.strip()) >= min_chars, without copying the page.
+    Extracted pages rarely start or end with whitespace, so strip() is
+    only needed when an end actually needs trimming.
+    """
+    if len(text) < min_chars:
+        return False
+    if not text[0].isspace() and not text[-1].isspace():
+        return True
+    return len(text.strip()) >= min_chars
+
+
+# ═══════════════════════════════════════════════════════════════
+# PAGE TEXT EXTRACTION
+# ═══════════════════════════════════════════════════════════════
+
+# Extract in worker processes for PDFs with at least this many pages
+PARALLEL_EXTRACT_MIN_PAGES = 200
+
+# Worker processes for page extraction (PARSE_WORKERS=1 disables parallelism)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Persistent worker pool - spawning processes (and re-importing fitz in each)
+# on every parse costs more than extracting a mid-sized spec
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get (or lazily create) the shared extraction process pool"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Stop the extraction workers (called on app shutdown)"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+
+
+def _page_texts(pdf: fitz.Document, start: int, end: int) -> List[str]:
+    """Extract cleaned text for pages [start, end) of an open document"""
+    return [clean_text(pdf[page_num].get_text()) for page_num in range(start, end)]
+
+
+def _extract_page_range(shm_name: str, size: int, start: int, end: int) -> List[str]:
+    """
+    Extract cleaned text for pages [start, end). Runs in a worker process.
+    The PDF is read from the parent's shared memory block instead of being
+    pickled through the task pipe.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        pdf = fitz.open(stream=bytes(shm.buf[:size]), filetype="pdf")
+    finally:
+        shm.close()
+    try:
+        return _page_texts(pdf, start, end)
+    finally:
+        pdf.close()
+
+
+def extract_page_texts(pdf: fitz.Document, pdf_bytes: bytes) -> List[str]:
+    """
+    Extract cleaned text for every page, in page order.
+
+    Small PDFs are read from the already-open document. Text extraction is
+    CPU-bound and a fitz.Document can't be shared across processes, so large
+    PDFs are split into contiguous page ranges and each worker process opens
+    its own copy from a shared memory block holding pdf_bytes.
+    """
+    total_pages = len(pdf)
+    workers = min(PARSE_WORKERS, total_pages)
+    if workers <= 1 or total_pages < PARALLEL_EXTRACT_MIN_PAGES:
+        return _page_texts(pdf, 0, total_pages)
+
+    chunk = -(-total_pages // workers)  # ceil division
+    ranges = [(i, min(i + chunk, total_pages)) for i in range(0, total_pages, chunk)]
+    logger.info(
+        "[PARSE] Extracting %s pages with %s workers...", total_pages, len(ranges)
+    )
+
+    # Copy the PDF into shared memory once - workers attach by name rather
+    # than each receiving a pickled copy of pdf_bytes
+    size = len(pdf_bytes)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        shm.buf[:size] = pdf_bytes
+
+        executor = get_process_pool()
+        futures = [
+            executor.submit(_extract_page_range, shm.name, size, start, end)
+            for start, end in ranges
+        ]
+
+        # Collect in submission order to keep pages ordered
+        texts = []
+        for future in futures:
+            texts.extend(future.result())
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return texts
+
+
 # ═══════════════════════════════════════════════════════════════
 # TIER 0: PDF OUTLINE/BOOKMARKS (Built-in TOC)
 # ═══════════════════════════════════════════════════════════════
@@ -143,15 +360,11 @@ def extract_pdf_outline(pdf: fitz.Document) -> Dict[str, int]:
 
     section_to_page = {}
 
-    # Pattern to extract section number from bookmark title
-    # Matches: "031000", "03 10 00", "033000 RIB - Cast-in-Place Concrete"
-    section_pattern = re.compile(r"(\d{2})\s*(\d{2})\s*(\d{2})(?:\.(\d+))?")
-
     for entry in toc:
         level, title, page = entry
 
         # Try to extract section number from title
-        match = section_pattern.search(title)
+        match = OUTLINE_SECTION_PATTERN.search(title)
         if match:
             div = match.group(1)
 
@@ -169,14 +382,16 @@ def extract_pdf_outline(pdf: fitz.Document) -> Dict[str, int]:
 
     # VALIDATION: Check if outline has any real trade divisions
     # If it's all Division 00/01, this is an "outline spec" - reject the outline
-    trade_divisions = [s for s in section_to_page.keys() if s[:2] not in ("00", "01")]
+    trade_divisions = [
+        s for s in section_to_page.keys() if s[:2] not in CONTRACT_DIVISIONS
+    ]
     if not trade_divisions:
-        print(
+        logger.info(
             "[PARSE] PDF outline only contains Division 00/01 - skipping outline, will use content scan"
         )
         return {}
 
-    print(f"[PARSE] PDF outline has {len(trade_divisions)} trade divisions")
+    logger.info("[PARSE] PDF outline has %s trade divisions", len(trade_divisions))
     return section_to_page
 
 
@@ -198,22 +413,6 @@ def detect_spec_format(pages_sample: List[str]) -> str:
         "section_spaced": 0,  # "SECTION 04 22 00"
     }
 
-    # Patterns to detect each format - more flexible
-    # Compact: 5 or 6 digits with no spaces before the dash
-    # Spaced: digits separated by spaces
-    patterns = {
-        "compact_page": re.compile(r"(0[1-9]|[1-4]\d)(\d{3,4})\s*[-–—]\s*\d{1,3}"),
-        "spaced_page": re.compile(
-            r"(0[1-9]|[1-4]\d)\s+(\d{2})\s*(\d{2})?\s*[-–—]\s*\d{1,3}"
-        ),
-        "section_compact": re.compile(
-            r"SECTION\s+(0[1-9]|[1-4]\d)(\d{3,4})\b", re.IGNORECASE
-        ),
-        "section_spaced": re.compile(
-            r"SECTION\s+(0[1-9]|[1-4]\d)\s+(\d{2})\s+(\d{2})", re.IGNORECASE
-        ),
-    }
-
     for text in pages_sample:
         if not text:
             continue
@@ -222,7 +421,7 @@ def detect_spec_format(pages_sample: List[str]) -> str:
         footer = text[-600:].upper() if len(text) > 600 else text.upper()
         search_text = header + "\n" + footer
 
-        for fmt, pattern in patterns.items():
+        for fmt, pattern in SPEC_FORMAT_PATTERNS.items():
             if pattern.search(search_text):
                 formats_found[fmt] += 1
 
@@ -232,8 +431,8 @@ def detect_spec_format(pages_sample: List[str]) -> str:
 
     best_format = max(formats_found, key=lambda k: formats_found[k])
 
-    print(f"[PARSE] Format detection: {formats_found}")
-    print(f"[PARSE] Using format: {best_format}")
+    logger.info("[PARSE] Format detection: %s", formats_found)
+    logger.info("[PARSE] Using format: %s", best_format)
 
     return best_format if formats_found[best_format] > 0 else "none"
 
@@ -268,25 +467,12 @@ def detect_division_from_content(
     header = text[:600].upper() if len(text) > 600 else text.upper()
     footer = text[-600:].upper() if len(text) > 600 else text.upper()
     search_regions = [header, footer]
-
-    # Define patterns - flexible to handle various real-world formats
-    # Compact: 5-6 digits no spaces (04220, 042200)
-    # Spaced: digits with spaces (04 22 00, 04 22 0)
-    patterns = {
-        "compact_page": re.compile(r"(0[1-9]|[1-4]\d)(\d{3,4})\s*[-–—]\s*\d{1,3}"),
-        "spaced_page": re.compile(
-            r"(0[1-9]|[1-4]\d)\s+(\d{2})\s*(\d{2})?(?:\.(\d+))?\s*[-–—]\s*\d{1,3}"
-        ),
-        "section_compact": re.compile(r"SECTION\s+(0[1-9]|[1-4]\d)(\d{3,4})\b"),
-        "section_spaced": re.compile(
-            r"SECTION\s+(0[1-9]|[1-4]\d)\s+(\d{2})\s+(\d{2})(?:\.(\d+))?"
-        ),
-    }
+    patterns = HEADER_FOOTER_PATTERNS
 
     def extract_section(match, fmt):
         """Extract section number from match based on format type."""
         div = match.group(1)
-        if div not in VALID_DIVISIONS or div in ("00", "01"):
+        if div not in TRADE_DIVISIONS:
             return None, None
 
         if fmt in ("compact_page", "section_compact"):
@@ -331,18 +517,59 @@ def detect_division_from_content(
                     return section, div
 
     # Pattern 3: "DIVISION XX" header (fallback for division start pages)
-    pattern_division = re.compile(r"DIVISION\s+(0?[1-9]|[1-4]\d)\b")
-
     for region in search_regions:
-        match = pattern_division.search(region)
-        if match:
-            div = match.group(1).zfill(2)
-            if div in VALID_DIVISIONS and div not in ("00", "01"):
+        digits = find_division_header(region)
+        if digits:
+            div = digits.zfill(2)
+            if div in TRADE_DIVISIONS:
                 return f"{div} 00 00", div
 
     return None, None
 
 
+def _is_word_char(text: str, index: int) -> bool:
+    """Regex \\w test for text[index] (False past the end of text)"""
+    if index >= len(text):
+        return False
+    char = text[index]
+    return char.isalnum() or char == "_"
+
+
+def find_division_header(text: str) -> Optional[str]:
+    """
+    Find the first "DIVISION XX" header and return its raw digits.
+
+    Hand-rolled equivalent of r"DIVISION\\s+(0?[1-9]|[1-4]\\d)\\b": locate the
+    keyword with str.find, then validate the tail directly instead of
+    letting the regex engine backtrack over the whitespace run.
+    """
+    length = len(text)
+    pos = text.find(DIVISION_HEADER_KEYWORD)
+    while pos >= 0:
+        i = pos + len(DIVISION_HEADER_KEYWORD)
+        j = i
+        while j < length and text[j].isspace():
+            j += 1
+
+        if j > i and j < length:
+            first = text[j]
+            second = text[j + 1] if j + 1 < length else ""
+            # Same alternation order as the regex: "0N", "N", then "[1-4]N"
+            if first == "0" and second and second in "123456789":
+                if not _is_word_char(text, j + 2):
+                    return text[j : j + 2]
+            elif first in "123456789":
+                if not _is_word_char(text, j + 1):
+                    return first
+                if first in "1234" and second.isdecimal():
+                    if not _is_word_char(text, j + 2):
+                        return text[j : j + 2]
+
+        pos = text.find(DIVISION_HEADER_KEYWORD, pos + 1)
+
+    return None
+
+
 def detect_all_divisions_from_content(text: str) -> List[Tuple[str, str]]:
     """
     Find section identifiers in page header/footer ONLY.
@@ -375,13 +602,9 @@ def detect_all_divisions_from_content(text: str) -> List[Tuple[str, str]]:
             return f"{div} {rest[:2]} {rest[2:4]}"
 
     # Spaced format: "04 22 00 - 5" or "04 22 0 - 5"
-    spaced_pattern = re.compile(
-        r"(0[1-9]|[1-4]\d)\s+(\d{2})\s*(\d{1,2})?(?:\.(\d+))?\s*[-–—]\s*\d{1,3}"
-    )
-
-    for match in spaced_pattern.finditer(search_text):
+    for match in SPACED_FOOTER_SCAN_PATTERN.finditer(search_text):
         div = match.group(1)
-        if div in VALID_DIVISIONS and div not in ("00", "01"):
+        if div in TRADE_DIVISIONS:
             g2 = match.group(2) or "00"
             g3 = match.group(3) or "00"
             if len(g3) == 1:
@@ -394,24 +617,18 @@ def detect_all_divisions_from_content(text: str) -> List[Tuple[str, str]]:
                 divisions.append((section, div))
 
     # Compact format: "04220 - 5" or "042200 - 5" (5 or 6 digits, no spaces)
-    compact_pattern = re.compile(r"(0[1-9]|[1-4]\d)(\d{3,4})\s*[-–—]\s*\d{1,3}")
-
-    for match in compact_pattern.finditer(search_text):
+    for match in HEADER_FOOTER_PATTERNS["compact_page"].finditer(search_text):
         div = match.group(1)
-        if div in VALID_DIVISIONS and div not in ("00", "01"):
+        if div in TRADE_DIVISIONS:
             section = normalize_section(div, match.group(2))
             if section not in seen:
                 seen.add(section)
                 divisions.append((section, div))
 
     # SECTION header spaced: "SECTION 04 22 00"
-    section_spaced = re.compile(
-        r"SECTION\s+(0[1-9]|[1-4]\d)\s+(\d{2})\s+(\d{2})(?:\.(\d+))?"
-    )
-
-    for match in section_spaced.finditer(search_text):
+    for match in HEADER_FOOTER_PATTERNS["section_spaced"].finditer(search_text):
         div = match.group(1)
-        if div in VALID_DIVISIONS and div not in ("00", "01"):
+        if div in TRADE_DIVISIONS:
             section = f"{match.group(1)} {match.group(2)} {match.group(3)}"
             if match.group(4):
                 section += f".{match.group(4)}"
@@ -420,11 +637,9 @@ def detect_all_divisions_from_content(text: str) -> List[Tuple[str, str]]:
                 divisions.append((section, div))
 
     # SECTION header compact: "SECTION 04220" or "SECTION 042200"
-    section_compact = re.compile(r"SECTION\s+(0[1-9]|[1-4]\d)(\d{3,4})\b")
-
-    for match in section_compact.finditer(search_text):
+    for match in HEADER_FOOTER_PATTERNS["section_compact"].finditer(search_text):
         div = match.group(1)
-        if div in VALID_DIVISIONS and div not in ("00", "01"):
+        if div in TRADE_DIVISIONS:
             section = normalize_section(div, match.group(2))
             if section not in seen:
                 seen.add(section)
@@ -453,6 +668,9 @@ def assign_pages_from_outline(
     # Sort sections by starting page
     sorted_sections = sorted(outline_map.items(), key=lambda x: x[1])
 
+    # Divisions present in the outline (same for every page, build once)
+    outline_divisions = set(s[:2] for s in outline_map.keys())
+
     for page in pages:
         page_num = page["page_number"]
 
@@ -483,16 +701,17 @@ def assign_pages_from_outline(
         )
         if content_div:
             # Check if this division is NOT in the outline
-            outline_divisions = set(s[:2] for s in outline_map.keys())
             if content_div not in outline_divisions:
                 # This division isn't in the outline - content wins!
                 page["section_number"] = content_section
                 page["division_code"] = content_div
                 page["classification_method"] = "content"
-                print(
-                    f"[PARSE] Page {page_num}: Content override - found {content_section} (not in outline)"
+                logger.debug(
+                    "[PARSE] Page %s: Content override - found %s (not in outline)",
+                    page_num,
+                    content_section,
                 )
-            elif assigned_section and assigned_section[:2] in ("00", "01"):
+            elif assigned_section and assigned_section[:2] in CONTRACT_DIVISIONS:
                 # Outline assigned generic section but content has real trade division
                 page["section_number"] = content_section
                 page["division_code"] = content_div
@@ -506,6 +725,17 @@ def assign_pages_from_outline(
 # ═══════════════════════════════════════════════════════════════
 
 
+def has_matches(pattern: re.Pattern, text: str, count: int) -> bool:
+    """
+    True if pattern matches at least `count` times in text.
+    Stops scanning at the count-th match instead of collecting every match.
+    """
+    for found, _ in enumerate(pattern.finditer(text), 1):
+        if found >= count:
+            return True
+    return False
+
+
 def find_toc_pages(pages: List[dict]) -> List[int]:
     """
     Find pages that are likely Table of Contents.
@@ -517,23 +747,12 @@ def find_toc_pages(pages: List[dict]) -> List[int]:
     for page in pages[:50]:  # Only check first 50 pages
         text = page.get("content", "").upper()
 
-        # Check for TOC indicators
-        has_toc_header = any(
-            marker in text
-            for marker in [
-                "TABLE OF CONTENTS",
-                "CONTENTS",
-                "INDEX OF SPECIFICATIONS",
-                "SPECIFICATION INDEX",
-            ]
-        )
-
-        # Count section number patterns on the page
-        section_pattern = re.compile(r"\b(\d{2})\s+(\d{2})\s+(\d{2})\b")
-        section_matches = section_pattern.findall(text)
+        # Check for TOC indicators (single scan for all markers)
+        if not TOC_HEADER_PATTERN.search(text):
+            continue
 
         # If has TOC header AND multiple section numbers, it's likely TOC
-        if has_toc_header and len(section_matches) >= 5:
+        if has_matches(SECTION_NUMBER_PATTERN, text, 5):
             toc_pages.append(page["page_number"])
 
     return toc_pages
@@ -552,23 +771,13 @@ def find_index_pages(pages: List[dict]) -> List[int]:
     for page in last_50:
         text = page.get("content", "").upper()
 
-        # Check for Index indicators
-        has_index_header = any(
-            marker in text
-            for marker in [
-                "INDEX",
-                "SPECIFICATION INDEX",
-                "SECTION INDEX",
-                "INDEX OF SECTIONS",
-            ]
-        )
-
-        # Count section number patterns on the page
-        section_pattern = re.compile(r"\b(\d{2})\s+(\d{2})\s+(\d{2})\b")
-        section_matches = section_pattern.findall(text)
+        # Check for Index indicators ("SPECIFICATION INDEX", "SECTION INDEX",
+        # "INDEX OF SECTIONS" all contain "INDEX")
+        if "INDEX" not in text:
+            continue
 
         # If has Index header AND multiple section numbers, it's likely Index
-        if has_index_header and len(section_matches) >= 5:
+        if has_matches(SECTION_NUMBER_PATTERN, text, 5):
             index_pages.append(page["page_number"])
 
     return index_pages
@@ -581,28 +790,17 @@ def is_toc_page(text: str) -> bool:
     These pages should be tagged as Division 00 (Procurement/General)
     rather than incorrectly classified based on section numbers listed.
     """
-    text_upper = text.upper()
-
     # Explicit TOC headers
-    if "TABLE OF CONTENTS" in text_upper:
-        return True
-    if "INDEX OF SPECIFICATIONS" in text_upper:
-        return True
-    if "SPECIFICATION INDEX" in text_upper:
+    if EXPLICIT_TOC_HEADER_PATTERN.search(text.upper()):
         return True
 
     # Multiple "Section XX XX XX" listings on same page = TOC page
     # This catches TOC pages without explicit headers
-    section_listings = re.findall(
-        r"Section\s+\d{2}\s+\d{2}\s+\d{2}", text, re.IGNORECASE
-    )
-    if len(section_listings) > 3:
+    if has_matches(SECTION_LISTING_PATTERN, text, 4):
         return True
 
-    # Many section numbers on a page (more than 5) = likely TOC/index
-    section_pattern = re.compile(r"\b(\d{2})\s+(\d{2})\s+(\d{2})\b")
-    section_matches = section_pattern.findall(text)
-    if len(section_matches) > 8:
+    # Many section numbers on a page (more than 8) = likely TOC/index
+    if has_matches(SECTION_NUMBER_PATTERN, text, 9):
         return True
 
     return False
@@ -624,26 +822,33 @@ def validate_toc_map(toc_map: dict, total_pages: int) -> dict:
     max_page = max(page_numbers)
     min_page = min(page_numbers)
 
-    print(
-        f"[PARSE] TOC validation: {len(toc_map)} sections, pages {min_page}-{max_page}, total_pages={total_pages}"
+    logger.info(
+        "[PARSE] TOC validation: %s sections, pages %s-%s, total_pages=%s",
+        len(toc_map),
+        min_page,
+        max_page,
+        total_pages,
     )
 
     # CRITICAL: If all page numbers are small (under 20) and start from 1-ish,
     # it's TOC page order, not real page numbers
     if max_page <= 20 and min_page <= 2:
-        print(
-            f"[PARSE] TOC pages look like TOC order (1-{max_page}), not real page numbers - rejecting"
+        logger.info(
+            "[PARSE] TOC pages look like TOC order (1-%s), not real page numbers - rejecting",
+            max_page,
         )
         return {}
 
     # If max page number is less than 10, definitely wrong
     if max_page < 10:
-        print(f"[PARSE] TOC max page {max_page} too low, rejecting")
+        logger.info("[PARSE] TOC max page %s too low, rejecting", max_page)
         return {}
 
     # If we don't span at least 20% of the document, probably wrong
     if max_page < total_pages * 0.2:
-        print(f"[PARSE] TOC doesn't span document ({max_page} vs {total_pages} pages)")
+        logger.info(
+            "[PARSE] TOC doesn't span document (%s vs %s pages)", max_page, total_pages
+        )
         return {}
 
     return toc_map
@@ -662,16 +867,7 @@ def parse_toc(toc_text: str) -> Dict[str, int]:
     """
     section_to_page = {}
 
-    # Pattern: section number followed eventually by a page number
-    # Handles dots, dashes, spaces between section and page
-    pattern = re.compile(
-        r"(\d{2})\s+(\d{2})\s+(\d{2})(?:\.(\d+))?"  # Section number
-        r"[^\d]*?"  # Non-digit chars (title, dots)
-        r"(\d{1,4})\s*$",  # Page number at end of line
-        re.MULTILINE,
-    )
-
-    for match in pattern.finditer(toc_text):
+    for match in TOC_LINE_PATTERN.finditer(toc_text):
         div = match.group(1)
 
         # Validate it's a real CSI division
@@ -708,42 +904,46 @@ def find_best_toc_map(
 
     # Parse and validate TOC
     if toc_pages:
-        print(f"[PARSE] Found text TOC on pages: {toc_pages}")
+        logger.info("[PARSE] Found text TOC on pages: %s", toc_pages)
         toc_text = "\n".join(
             p["content"] for p in pages if p["page_number"] in toc_pages
         )
         raw_map = parse_toc(toc_text)
         if raw_map:
-            print(f"[PARSE] TOC parsed {len(raw_map)} sections, validating...")
+            logger.info("[PARSE] TOC parsed %s sections, validating...", len(raw_map))
             toc_map = validate_toc_map(raw_map, total_pages)
             if toc_map:
-                print(f"[PARSE] TOC validated with {len(toc_map)} sections")
+                logger.info("[PARSE] TOC validated with %s sections", len(toc_map))
 
     # Parse and validate Index
     if index_pages:
-        print(f"[PARSE] Found Index on pages: {index_pages}")
+        logger.info("[PARSE] Found Index on pages: %s", index_pages)
         index_text = "\n".join(
             p["content"] for p in pages if p["page_number"] in index_pages
         )
         raw_map = parse_toc(index_text)
         if raw_map:
-            print(f"[PARSE] Index parsed {len(raw_map)} sections, validating...")
+            logger.info("[PARSE] Index parsed %s sections, validating...", len(raw_map))
             index_map = validate_toc_map(raw_map, total_pages)
             if index_map:
-                print(f"[PARSE] Index validated with {len(index_map)} sections")
+                logger.info("[PARSE] Index validated with %s sections", len(index_map))
 
     # Return whichever has more sections
     if len(index_map) > len(toc_map):
         if toc_map:
-            print(f"[PARSE] Using Index ({len(index_map)}) over TOC ({len(toc_map)})")
+            logger.info(
+                "[PARSE] Using Index (%s) over TOC (%s)", len(index_map), len(toc_map)
+            )
         return index_map, "index"
     elif toc_map:
         if index_map:
-            print(f"[PARSE] Using TOC ({len(toc_map)}) over Index ({len(index_map)})")
+            logger.info(
+                "[PARSE] Using TOC (%s) over Index (%s)", len(toc_map), len(index_map)
+            )
         return toc_map, "toc"
 
     if not toc_pages and not index_pages:
-        print("[PARSE] No text TOC or Index found")
+        logger.info("[PARSE] No text TOC or Index found")
 
     return {}, ""
 
@@ -852,24 +1052,19 @@ def extract_section_from_footer(text: str) -> Tuple[Optional[str], Optional[str]
     if not text or len(text) < 100:
         return None, None
 
-    # Check both header (first 600 chars) and footer (last 600 chars)
-    header = text[:600] if len(text) > 600 else text
-    footer = text[-600:] if len(text) > 600 else text
+    # Check both header (first 600 chars) and footer (last 600 chars).
+    # Bounds are passed to search() as pos/endpos rather than slicing copies
+    # (neither pattern has anchors or lookbehind, so results are identical)
+    header_end = min(len(text), 600)
+    footer_start = max(0, len(text) - 600)
 
-    # STRICT pattern 1: section number + dash + page number (with optional "/ total")
-    # Matches: "03 30 00 - 12", "00 01 10 - 1 / 9"
-    strict_pattern = re.compile(
-        r"(\d{2})\s+(\d{2})\s+(\d{2})(?:\.(\d+))?\s*[-–—]\s*(\d{1,3})(?:\s*/\s*\d+)?",
-        re.MULTILINE,
-    )
-
-    # STRICT pattern 2: "SECTION XX XX XX" in header (common format)
-    section_header_pattern = re.compile(
-        r"SECTION\s+(\d{2})\s+(\d{2})\s+(\d{2})(?:\.(\d+))?", re.IGNORECASE
-    )
+    # STRICT pattern 1: section number + dash + page number (STRICT_FOOTER_PATTERN)
+    # STRICT pattern 2: "SECTION XX XX XX" in header (SECTION_HEADER_PATTERN)
+    strict_pattern = STRICT_FOOTER_PATTERN
+    section_header_pattern = SECTION_HEADER_PATTERN
 
     # Try footer first (most reliable)
-    match = strict_pattern.search(footer)
+    match = strict_pattern.search(text, footer_start)
     if match:
         div = match.group(1)
         if is_valid_division(match.group(1), match.group(2), match.group(3)):
@@ -879,7 +1074,7 @@ def extract_section_from_footer(text: str) -> Tuple[Optional[str], Optional[str]
             return section, div
 
     # Try header with strict pattern
-    match = strict_pattern.search(header)
+    match = strict_pattern.search(text, 0, header_end)
     if match:
         div = match.group(1)
         if is_valid_division(match.group(1), match.group(2), match.group(3)):
@@ -889,7 +1084,7 @@ def extract_section_from_footer(text: str) -> Tuple[Optional[str], Optional[str]
             return section, div
 
     # Try "SECTION XX XX XX" pattern in header
-    match = section_header_pattern.search(header)
+    match = section_header_pattern.search(text, 0, header_end)
     if match:
         div = match.group(1)
         if is_valid_division(match.group(1), match.group(2), match.group(3)):
@@ -908,8 +1103,17 @@ def extract_section_from_footer(text: str) -> Tuple[Optional[str], Optional[str]
 # Batch size for AI classification (to stay within token limits)
 AI_BATCH_SIZE = 100
 
+# Maximum concurrent AI classification batches
+AI_MAX_CONCURRENT_BATCHES = 4
+
+# Pages whose header has no "SECTION" word (letter-spaced OCR included) can't
+# contain the "SECTION XX YY ZZ" header the AI looks for - don't send them
+AI_HEADER_PREFILTER = re.compile(r"S\s?E\s?C\s?T\s?I\s?O\s?N", re.IGNORECASE)
+
 
-def ai_find_section_boundaries(pages: List[dict]) -> List[Tuple[int, str, str]]:
+def ai_find_section_boundaries(
+    pages: List[dict],
+) -> Tuple[List[Tuple[int, str, str]], bool]:
     """
     Use AI to find section start pages, then use boundaries for classification.
 
@@ -917,53 +1121,69 @@ def ai_find_section_boundaries(pages: List[dict]) -> List[Tuple[int, str, str]]:
     1. AI scans page headers to find "SECTION XX YY ZZ" patterns
     2. Use section start pages as boundaries to assign all pages
 
-    Returns: List of (page_number, section_number, division_code) for section starts
+    Returns: (boundaries, complete) - boundaries are (page_number,
+    section_number, division_code) for section starts; complete is False if
+    the AI call (or any batch of it) failed, so the result is missing
+    boundaries a retry could find
     """
     import asyncio
 
     if not GEMINI_API_KEY:
-        print("[PARSE] AI fallback: No GEMINI_API_KEY configured, skipping")
-        return []
+        logger.info("[PARSE] AI fallback: No GEMINI_API_KEY configured, skipping")
+        return [], True
 
     if not pages:
-        return []
+        return [], True
 
-    print(f"[PARSE] AI fallback: Finding section boundaries in {len(pages)} pages...")
+    # Same 300-char header window the AI prompt uses
+    candidates = [
+        p for p in pages if AI_HEADER_PREFILTER.search(p.get("content", ""), 0, 300)
+    ]
+    logger.info(
+        "[PARSE] AI fallback: %s/%s page headers mention SECTION (%s skipped locally)",
+        len(candidates),
+        len(pages),
+        len(pages) - len(candidates),
+    )
+    if not candidates:
+        return [], True
 
-    # Run async classification
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    logger.info(
+        "[PARSE] AI fallback: Finding section boundaries in %s pages...",
+        len(candidates),
+    )
 
+    # Run async classification on its own loop. parse_spec runs in a worker
+    # thread (see /parse), so there is no running loop here to block.
     try:
-        boundaries = loop.run_until_complete(_ai_find_boundaries_async(pages))
-        return boundaries
+        return asyncio.run(_ai_find_boundaries_async(candidates))
     except Exception as e:
-        print(f"[PARSE] AI fallback failed: {e}")
-        return []
+        logger.warning("[PARSE] AI fallback failed: %s", e)
+        return [], False
 
 
 async def _ai_find_boundaries_async(
     pages: List[dict],
-) -> List[Tuple[int, str, str]]:
+) -> Tuple[List[Tuple[int, str, str]], bool]:
     """
     Async implementation: Find section boundaries by scanning page headers.
-    Returns list of (page_number, section_number, division_code) tuples.
+    Batches are sent concurrently (up to AI_MAX_CONCURRENT_BATCHES at a time).
+    Returns (list of (page_number, section_number, division_code) tuples,
+    whether every batch succeeded).
     """
-    all_boundaries = []
-    total_pages = len(pages)
+    import asyncio
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        for batch_start in range(0, total_pages, AI_BATCH_SIZE):
-            batch_end = min(batch_start + AI_BATCH_SIZE, total_pages)
-            batch = pages[batch_start:batch_end]
+    total_pages = len(pages)
+    semaphore = asyncio.Semaphore(AI_MAX_CONCURRENT_BATCHES)
 
-            print(f"[PARSE] AI batch {batch_start + 1}-{batch_end} of {total_pages}...")
+    async def classify_batch(
+        client: httpx.AsyncClient, batch_start: int
+    ) -> Optional[List[Tuple[int, str, str]]]:
+        batch_end = min(batch_start + AI_BATCH_SIZE, total_pages)
+        batch = pages[batch_start:batch_end]
 
-            # Build prompt - ask for section headers only
-            prompt = """Find SECTION headers in these construction specification page headers.
+        # Build prompt - ask for section headers only
+        prompt = """Find SECTION headers in these construction specification page headers.
 
 For each page, if it has a "SECTION XX YY ZZ" header, return: {"page": N, "section": "XX YY ZZ"}
 If no SECTION header, skip that page.
@@ -980,12 +1200,20 @@ Example: [{"page": 5, "section": "01 30 00"}, {"page": 100, "section": "23 05 15
 
 PAGE HEADERS:
 """
-            for page in batch:
-                page_num = page.get("page_number", 0)
-                content = page.get("content", "")
-                # First 300 chars to catch section header
-                header = content[:300].replace("\n", " ").strip()
-                prompt += f"Page {page_num}: {header}\n"
+        for page in batch:
+            page_num = page.get("page_number", 0)
+            content = page.get("content", "")
+            # First 300 chars to catch section header
+            header = content[:300].replace("\n", " ").strip()
+            prompt += f"Page {page_num}: {header}\n"
+
+        async with semaphore:
+            logger.debug(
+                "[PARSE] AI batch %s-%s of %s...",
+                batch_start + 1,
+                batch_end,
+                total_pages,
+            )
 
             # Call Gemini API
             try:
@@ -996,15 +1224,18 @@ PAGE HEADERS:
                         "generationConfig": {
                             "temperature": 0,
                             "maxOutputTokens": 4000,
+                            "responseMimeType": "application/json",
                         },
                     },
                 )
 
                 if response.status_code != 200:
-                    print(
-                        f"[PARSE] AI API error {response.status_code}: {response.text[:200]}"
+                    logger.error(
+                        "[PARSE] AI API error %s: %s",
+                        response.status_code,
+                        response.text[:200],
                     )
-                    continue
+                    return None
 
                 data = response.json()
                 result_text = (
@@ -1015,43 +1246,71 @@ PAGE HEADERS:
                 )
 
                 # Parse boundaries from response
-                batch_boundaries = _parse_boundary_response(result_text)
-                all_boundaries.extend(batch_boundaries)
+                return _parse_boundary_response(result_text)
 
             except Exception as e:
-                print(f"[PARSE] AI batch error: {e}")
+                logger.error("[PARSE] AI batch error: %s", e)
+                return None
+
+    # One HTTP/2 connection multiplexes every concurrent batch, so the parse
+    # pays a single TCP+TLS handshake (the client lives in this asyncio.run
+    # loop, so it can't share analyzer's app-wide client)
+    async with httpx.AsyncClient(
+        http2=True,
+        timeout=60.0,
+        limits=httpx.Limits(
+            max_connections=AI_MAX_CONCURRENT_BATCHES,
+            max_keepalive_connections=AI_MAX_CONCURRENT_BATCHES,
+        ),
+    ) as client:
+        batch_results = await asyncio.gather(
+            *(
+                classify_batch(client, batch_start)
+                for batch_start in range(0, total_pages, AI_BATCH_SIZE)
+            )
+        )
+
+    # Boundaries from the batches that worked are still applied
+    failed_batches = sum(1 for batch in batch_results if batch is None)
+    all_boundaries = [b for batch in batch_results if batch for b in batch]
 
     # Sort by page number
     all_boundaries.sort(key=lambda x: x[0])
-    print(f"[PARSE] AI found {len(all_boundaries)} section boundaries")
+    logger.info("[PARSE] AI found %s section boundaries", len(all_boundaries))
+    if failed_batches:
+        logger.warning(
+            "[PARSE] AI fallback incomplete: %s/%s batches failed",
+            failed_batches,
+            len(batch_results),
+        )
 
-    return all_boundaries
+    return all_boundaries, failed_batches == 0
 
 
-def _parse_boundary_response(response_text: str) -> List[Tuple[int, str, str]]:
+def _parse_boundary_response(
+    response_text: str,
+) -> Optional[List[Tuple[int, str, str]]]:
     """
     Parse AI response for section boundaries.
-    Returns list of (page_number, section_number, division_code) tuples.
+    Returns list of (page_number, section_number, division_code) tuples, or
+    None if the response isn't a usable JSON array.
     """
     boundaries = []
 
     try:
-        # Clean up response - find JSON array
-        text = response_text.strip()
+        # Tolerates code fences / prose around the array
+        results = extract_json(response_text)
 
-        # Find array bounds
-        start_idx = text.find("[")
-        end_idx = text.rfind("]")
-
-        if start_idx == -1 or end_idx == -1:
-            print(f"[PARSE] AI boundary response not JSON array: {text[:100]}")
-            return []
-
-        json_str = text[start_idx : end_idx + 1]
-        results = json.loads(json_str)
+        # Array wrapped in an object, e.g. {"sections": [...]}
+        if isinstance(results, dict):
+            results = next((v for v in results.values() if isinstance(v, list)), None)
 
         if not isinstance(results, list):
-            return []
+            logger.warning(
+                "[PARSE] AI boundary response not JSON array: %s",
+                response_text[:100].strip(),
+            )
+            return None
 
         for item in results:
             if not isinstance(item, dict):
@@ -1074,9 +1333,9 @@ def _parse_boundary_response(response_text: str) -> List[Tuple[int, str, str]]:
 
         return boundaries
 
-    except json.JSONDecodeError as e:
-        print(f"[PARSE] AI boundary JSON parse error: {e}")
-        return []
+    except orjson.JSONDecodeError as e:
+        logger.error("[PARSE] AI boundary JSON parse error: %s", e)
+        return None
 
 
 def apply_section_boundaries(
@@ -1111,7 +1370,7 @@ def apply_section_boundaries(
                     page["classification_method"] = "ai"
 
     ai_count = sum(1 for p in pages if p.get("classification_method") == "ai")
-    print(f"[PARSE] AI boundaries assigned {ai_count} pages")
+    logger.info("[PARSE] AI boundaries assigned %s pages", ai_count)
 
 
 # Legacy keyword fallback (disabled - replaced by AI)
@@ -1156,8 +1415,7 @@ def extract_cross_references(text: str, own_section: Optional[str]) -> List[str]
     Find all section numbers mentioned in the page text.
     Exclude the page's own section number.
     """
-    pattern = re.compile(r"\b(\d{2})\s+(\d{2})\s+(\d{2})\b")
-    matches = pattern.findall(text)
+    matches = SECTION_NUMBER_PATTERN.findall(text)
 
     refs = set()
     for m in matches:
@@ -1169,7 +1427,72 @@ def extract_cross_references(text: str, own_section: Optional[str]) -> List[str]
         if is_valid_division(m[0], m[1], m[2]):
             refs.add(ref)
 
-    return sorted(list(refs))
+    return sorted(refs)
+
+
+# ═══════════════════════════════════════════════════════════════
+# PARSE RESULT CACHE
+# ═══════════════════════════════════════════════════════════════
+
+# Parse results keyed by SHA-256 of the PDF bytes. Output depends only on the
+# bytes (spec_id is stamped onto each page), so re-parsing the same file -
+# retries after a failed insert, duplicate uploads - skips extraction entirely.
+# Each entry holds a whole spec's page text, so the cache is bounded by total
+# text size: (text chars, result) per entry, oldest evicted first.
+_parse_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+_parse_cache_chars = 0
+_PARSE_CACHE_MAX_CHARS = 64 * 1024 * 1024
+_parse_cache_lock = threading.Lock()
+
+
+def _result_for_spec(result: Dict[str, Any], spec_id: str) -> Dict[str, Any]:
+    """Copy of a parse result with fresh page dicts stamped with spec_id"""
+    return {
+        **result,
+        "pages": [{**page, "spec_id": spec_id} for page in result["pages"]],
+    }
+
+
+def parse_spec(
+    pdf_bytes: bytes, spec_id: str, use_cache: bool = True
+) -> Dict[str, Any]:
+    """
+    Parse a spec PDF, reusing the cached result for identical bytes.
+    Pass use_cache=False to force a fresh parse (the result is still cached,
+    unless the AI fallback failed).
+    """
+    pdf_hash = hashlib.sha256(pdf_bytes).hexdigest()
+
+    global _parse_cache_chars
+
+    if use_cache:
+        with _parse_cache_lock:
+            cached = _parse_cache.get(pdf_hash)
+        if cached is not None:
+            logger.info("[PARSE] Cache hit for PDF %s, skipping parse", pdf_hash[:12])
+            return _result_for_spec(cached[1], spec_id)
+
+    result = _parse_spec_uncached(pdf_bytes, spec_id)
+    size = sum(len(page.get("content") or "") for page in result["pages"])
+
+    with _parse_cache_lock:
+        stale = _parse_cache.pop(pdf_hash, None)
+        if stale is not None:
+            _parse_cache_chars -= stale[0]
+
+        # A failed AI fallback would be locked in for these bytes - exactly
+        # the re-parse / re-upload cases the cache exists for
+        if not result["ai_fallback_complete"]:
+            logger.info("[PARSE] AI fallback incomplete, not caching parse result")
+        elif size <= _PARSE_CACHE_MAX_CHARS:
+            while _parse_cache and _parse_cache_chars + size > _PARSE_CACHE_MAX_CHARS:
+                evicted_size, _ = _parse_cache.pop(next(iter(_parse_cache)))
+                _parse_cache_chars -= evicted_size
+            _parse_cache[pdf_hash] = (size, result)
+            _parse_cache_chars += size
+
+    # Callers get their own page dicts so the cached copy is never mutated
+    return _result_for_spec(result, spec_id)
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -1177,7 +1500,7 @@ def extract_cross_references(text: str, own_section: Optional[str]) -> List[str]
 # ═══════════════════════════════════════════════════════════════
 
 
-def parse_spec(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
+def _parse_spec_uncached(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
     """
     Hybrid parser using 4-tier approach:
     0. Try PDF outline/bookmarks first (most reliable)
@@ -1189,27 +1512,28 @@ def parse_spec(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
     """
     pages = []
 
-    print(f"[PARSE] Starting hybrid parse for spec {spec_id}")
-    print(f"[PARSE] PDF size: {len(pdf_bytes):,} bytes")
+    logger.info("[PARSE] Starting hybrid parse for spec %s", spec_id)
+    logger.info("[PARSE] PDF size: %s bytes", len(pdf_bytes))
 
     pdf = fitz.open(stream=pdf_bytes, filetype="pdf")
     total_pages = len(pdf)
-    print(f"[PARSE] Total pages: {total_pages}")
+    logger.info("[PARSE] Total pages: %s", total_pages)
 
     # TIER 0: Try PDF outline/bookmarks first (before extracting pages)
     outline_map = extract_pdf_outline(pdf)
     if outline_map:
-        print(f"[PARSE] Found PDF outline with {len(outline_map)} sections")
+        logger.info("[PARSE] Found PDF outline with %s sections", len(outline_map))
     else:
-        print("[PARSE] No PDF outline/bookmarks found")
+        logger.info("[PARSE] No PDF outline/bookmarks found")
 
-    # Extract all pages
-    for page_num in range(total_pages):
-        page = pdf[page_num]
-        text = clean_text(page.get_text())
+    # Extract all pages (reuses the open document - no second parse of the PDF
+    # unless extraction fans out to worker processes)
+    page_texts = extract_page_texts(pdf, pdf_bytes)
+    pdf.close()
 
+    for page_num, text in enumerate(page_texts):
         # Skip blank/nearly blank pages
-        if not text or len(text.strip()) < 50:
+        if not text or not has_min_content(text):
             continue
 
         pages.append(
@@ -1224,14 +1548,10 @@ def parse_spec(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
             }
         )
 
-        # Progress logging every 100 pages
-        if (page_num + 1) % 100 == 0:
-            print(f"[PARSE] Extracted {page_num + 1}/{total_pages} pages...")
-            gc.collect()
-
-    pdf.close()
+    del page_texts
+    gc.collect()
 
-    print(f"[PARSE] Extracted {len(pages)} pages with content")
+    logger.info("[PARSE] Extracted %s pages with content", len(pages))
 
     # DETECT SPEC FORMAT: Scan first 50 pages to determine footer/header format
     sample_pages = [p["content"] for p in pages[:50]]
@@ -1243,7 +1563,7 @@ def parse_spec(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
         outline_classified = sum(
             1 for p in pages if p.get("classification_method") == "outline"
         )
-        print(f"[PARSE] Outline classified {outline_classified} pages")
+        logger.info("[PARSE] Outline classified %s pages", outline_classified)
 
     # Pre-tag TOC/index pages as Division 00 BEFORE any classification
     # This prevents TOC pages from being assigned to sections listed on them
@@ -1257,7 +1577,9 @@ def parse_spec(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
             toc_page_count += 1
 
     if toc_page_count > 0:
-        print(f"[PARSE] Pre-tagged {toc_page_count} TOC/index pages as Division 00")
+        logger.info(
+            "[PARSE] Pre-tagged %s TOC/index pages as Division 00", toc_page_count
+        )
 
     # TIER 1: Try text-based TOC and Index parsing
     section_map, map_source = find_best_toc_map(pages, total_pages)
@@ -1295,6 +1617,7 @@ def parse_spec(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
     # If we still have many unclassified pages, use AI to find section headers
     # then assign pages based on boundaries (not per-page classification)
     unclassified_pages = [p for p in pages if p["division_code"] is None]
+    ai_fallback_complete = True
 
     if unclassified_pages:
         classified_count = len(pages) - len(unclassified_pages)
@@ -1302,19 +1625,21 @@ def parse_spec(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
 
         # Only use AI if less than 50% of pages are classified
         if classified_ratio < 0.5:
-            print(
-                f"[PARSE] Only {classified_ratio:.0%} classified - triggering AI fallback"
+            logger.info(
+                "[PARSE] Only %.0f%% classified - triggering AI fallback",
+                classified_ratio * 100,
             )
 
             # Find section boundaries using AI
-            boundaries = ai_find_section_boundaries(pages)
+            boundaries, ai_fallback_complete = ai_find_section_boundaries(pages)
 
             if boundaries:
                 # Apply boundaries to assign pages
                 apply_section_boundaries(pages, boundaries)
         else:
-            print(
-                f"[PARSE] {classified_ratio:.0%} already classified - skipping AI fallback"
+            logger.info(
+                "[PARSE] %.0f%% already classified - skipping AI fallback",
+                classified_ratio * 100,
             )
 
     # Extract cross-references for all pages
@@ -1327,6 +1652,8 @@ def parse_spec(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
             page["cross_refs"] = None
 
     # Build division summary (includes content_scan reclassification)
+    # Page numbers are kept in sets while building - the content scan below
+    # checks membership / removes on every page, which is O(n) on a list
     divisions_found = set()
     sections_found = set()
     division_summary = {}
@@ -1336,8 +1663,8 @@ def parse_spec(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
         if div:
             divisions_found.add(div)
             if div not in division_summary:
-                division_summary[div] = {"pages": [], "count": 0, "sections": set()}
-            division_summary[div]["pages"].append(p["page_number"])
+                division_summary[div] = {"pages": set(), "count": 0, "sections": set()}
+            division_summary[div]["pages"].add(p["page_number"])
             division_summary[div]["count"] += 1
             if p["section_number"]:
                 sections_found.add(p["section_number"])
@@ -1357,7 +1684,7 @@ def parse_spec(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
                 old_div = p["division_code"]
                 if old_div and old_div in division_summary:
                     if p["page_number"] in division_summary[old_div]["pages"]:
-                        division_summary[old_div]["pages"].remove(p["page_number"])
+                        division_summary[old_div]["pages"].discard(p["page_number"])
                         division_summary[old_div]["count"] -= 1
 
                 p["division_code"] = content_div
@@ -1369,12 +1696,12 @@ def parse_spec(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
             sections_found.add(section)
             if content_div not in division_summary:
                 division_summary[content_div] = {
-                    "pages": [],
+                    "pages": set(),
                     "count": 0,
                     "sections": set(),
                 }
             if p["page_number"] not in division_summary[content_div]["pages"]:
-                division_summary[content_div]["pages"].append(p["page_number"])
+                division_summary[content_div]["pages"].add(p["page_number"])
                 division_summary[content_div]["count"] += 1
             division_summary[content_div]["sections"].add(section)
 
@@ -1384,11 +1711,10 @@ def parse_spec(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
     }
     divisions_found = set(division_summary.keys())
 
-    # Convert sections set to list for JSON serialization
-    for div in division_summary:
-        division_summary[div]["sections"] = sorted(
-            list(division_summary[div]["sections"])
-        )
+    # Convert page/section sets to sorted lists for JSON serialization
+    for info in division_summary.values():
+        info["pages"] = sorted(info["pages"])
+        info["sections"] = sorted(info["sections"])
 
     # Build classification stats (after content_scan reclassification for accuracy)
     classified = sum(1 for p in pages if p["division_code"])
@@ -1417,25 +1743,28 @@ def parse_spec(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
     ai_classified = sum(1 for p in pages if p.get("classification_method") == "ai")
     unclassified = len(pages) - classified
 
-    print("[PARSE] Classification summary:")
-    print(f"[PARSE]   Total pages: {len(pages)}")
-    print(f"[PARSE]   Classified: {classified}")
-    print(f"[PARSE]     - By PDF outline: {outline_classified}")
-    print(f"[PARSE]     - By content scan: {content_classified}")
-    print(f"[PARSE]     - By outline+content: {outline_plus_classified}")
-    print(f"[PARSE]     - By text TOC: {toc_classified}")
-    print(f"[PARSE]     - By Index: {index_classified}")
-    print(f"[PARSE]     - By footer: {footer_classified}")
-    print(f"[PARSE]     - By AI header scan: {ai_classified}")
-    print(f"[PARSE]     - By inherit: {inherit_classified}")
-    print(f"[PARSE]     - TOC/index pages (Div 00): {toc_page_classified}")
-    print(f"[PARSE]   Unclassified: {unclassified}")
-
-    print(f"[PARSE] Found {len(divisions_found)} divisions:")
+    logger.info("[PARSE] Classification summary:")
+    logger.info("[PARSE]   Total pages: %s", len(pages))
+    logger.info("[PARSE]   Classified: %s", classified)
+    logger.info("[PARSE]     - By PDF outline: %s", outline_classified)
+    logger.info("[PARSE]     - By content scan: %s", content_classified)
+    logger.info("[PARSE]     - By outline+content: %s", outline_plus_classified)
+    logger.info("[PARSE]     - By text TOC: %s", toc_classified)
+    logger.info("[PARSE]     - By Index: %s", index_classified)
+    logger.info("[PARSE]     - By footer: %s", footer_classified)
+    logger.info("[PARSE]     - By AI header scan: %s", ai_classified)
+    logger.info("[PARSE]     - By inherit: %s", inherit_classified)
+    logger.info("[PARSE]     - TOC/index pages (Div 00): %s", toc_page_classified)
+    logger.info("[PARSE]   Unclassified: %s", unclassified)
+
+    logger.info("[PARSE] Found %s divisions:", len(divisions_found))
     for div in sorted(division_summary.keys()):
         info = division_summary[div]
-        print(
-            f"[PARSE]   Division {div}: {info['count']} pages, {len(info['sections'])} sections"
+        logger.info(
+            "[PARSE]   Division %s: %s pages, %s sections",
+            div,
+            info["count"],
+            len(info["sections"]),
         )
 
     return {
@@ -1448,6 +1777,8 @@ def parse_spec(pdf_bytes: bytes, spec_id: str) -> Dict[str, Any]:
         "outline_sections_mapped": len(outline_map),
         "toc_found": map_source in ("toc", "index"),
         "toc_sections_mapped": len(section_map),
+        # False when the Tier-3 AI call failed - a retry may classify better
+        "ai_fallback_complete": ai_fallback_complete,
         "classification_stats": {
             "total": len(pages),
             "classified": classified,
@@ -1476,7 +1807,10 @@ TILE_SIZE = 4000  # Characters per tile
 TILE_OVERLAP = 500  # Overlap between tiles
 
 # Cross-reference pattern for legacy functions
-CROSS_REF_PATTERN = re.compile(r"\b(\d{2})\s+(\d{2})\s+(\d{2})\b")
+CROSS_REF_PATTERN = SECTION_NUMBER_PATTERN
+
+# "--- Page N ---" markers in stitched division text
+PAGE_MARKER_PATTERN = re.compile(r"--- Page (\d+) ---")
 
 
 def tile_text(
@@ -1497,13 +1831,11 @@ def tile_text(
     start = 0
     tile_index = 0
 
-    page_pattern = re.compile(r"--- Page (\d+) ---")
-
     while start < len(text):
         end = min(start + tile_size, len(text))
         tile_content = text[start:end]
 
-        pages_in_tile = page_pattern.findall(tile_content)
+        pages_in_tile = PAGE_MARKER_PATTERN.findall(tile_content)
         page_from = int(pages_in_tile[0]) if pages_in_tile else 0
         page_to = int(pages_in_tile[-1]) if pages_in_tile else page_from
 
@@ -5,6 +5,8 @@ Each prompt is designed for a specific trade/division and creates scannable
 summaries that help subcontractors price jobs quickly.
 """
 
+from functools import lru_cache
+
 # ═══════════════════════════════════════════════════════════════
 # UNIFIED OUTPUT PREFIX - Prepended to all prompts
 # ═══════════════════════════════════════════════════════════════
@@ -2282,9 +2284,12 @@ Format: [Item]: [Impact]
 # ═══════════════════════════════════════════════════════════════
 
 
+@lru_cache(maxsize=None)
 def get_summarize_prompt(trade: str, division: str = None) -> str:
     """
     Get the appropriate summarize prompt for a trade/division.
+    Cached per (trade, division) - the prefixed prompt is built once, not on
+    every analysis.
 
     Args:
         trade: Trade name (e.g., "electrical", "masonry")
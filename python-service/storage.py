@@ -3,8 +3,11 @@ R2 Storage Integration (Cloudflare R2 via S3-compatible API)
 """
 
 import os
+import threading
+from typing import BinaryIO, Iterator, Tuple
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 
 # R2 Configuration
@@ -13,30 +16,95 @@ R2_ACCESS_KEY_ID = os.getenv("R2_ACCESS_KEY_ID")
 R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY")
 R2_BUCKET_NAME = os.getenv("R2_BUCKET_NAME", "spec-analyzer")
 
-
-def get_r2_client():
-    """Create R2 client using S3-compatible API"""
-    return boto3.client(
-        "s3",
-        endpoint_url=f"https://{R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
-        aws_access_key_id=R2_ACCESS_KEY_ID,
-        aws_secret_access_key=R2_SECRET_ACCESS_KEY,
-        config=Config(signature_version="s3v4"),
-        region_name="auto",
-    )
+# Large uploads are streamed to R2 as multipart parts of this size, so memory
+# per upload stays at a few parts instead of the whole file
+UPLOAD_PART_SIZE = 8 * 1024 * 1024
+UPLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=UPLOAD_PART_SIZE,
+    multipart_chunksize=UPLOAD_PART_SIZE,
+    use_threads=True,
+)
+
+# Submittal file types accepted for upload, by extension
+SUBMITTAL_MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".doc": "application/msword",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".xls": "application/vnd.ms-excel",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".rtf": "application/rtf",
+    ".txt": "text/plain",
+    ".csv": "text/csv",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".tif": "image/tiff",
+    ".tiff": "image/tiff",
+    ".bmp": "image/bmp",
+    ".ppt": "application/vnd.ms-powerpoint",
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    ".odt": "application/vnd.oasis.opendocument.text",
+    ".ods": "application/vnd.oasis.opendocument.spreadsheet",
+    ".odp": "application/vnd.oasis.opendocument.presentation",
+}
+SUBMITTAL_EXTENSIONS = frozenset(SUBMITTAL_MIME_TYPES)
+
+# Streamed downloads are relayed to the client in chunks of this size
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+# Shared client's connection pool - covers concurrent requests plus the
+# multipart upload threads (TransferConfig default: 10 per transfer)
+R2_MAX_POOL_CONNECTIONS = 32
+R2_MAX_ATTEMPTS = 5  # adaptive mode also rate-limits client-side on throttling
+
+_r2_client = None
+_r2_client_lock = threading.Lock()  # storage helpers run in worker threads
 
 
-def upload_pdf(user_id: str, job_id: str, spec_id: str, pdf_bytes: bytes) -> str:
+def get_r2_client():
+    """
+    Get the R2 client (S3-compatible API), shared across calls.
+    boto3 clients are thread-safe once built; building one is not, and it
+    costs endpoint/credential resolution plus a fresh connection pool.
     """
-    Upload PDF to R2 storage
+    global _r2_client
+    if _r2_client is None:
+        with _r2_client_lock:
+            if _r2_client is None:
+                _r2_client = boto3.client(
+                    "s3",
+                    endpoint_url=f"https://{R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
+                    aws_access_key_id=R2_ACCESS_KEY_ID,
+                    aws_secret_access_key=R2_SECRET_ACCESS_KEY,
+                    config=Config(
+                        signature_version="s3v4",
+                        max_pool_connections=R2_MAX_POOL_CONNECTIONS,
+                        retries={"mode": "adaptive", "max_attempts": R2_MAX_ATTEMPTS},
+                        tcp_keepalive=True,
+                    ),
+                    region_name="auto",
+                )
+    return _r2_client
+
+
+def upload_pdf(user_id: str, job_id: str, spec_id: str, pdf_file: BinaryIO) -> str:
+    """
+    Upload PDF to R2 storage, streaming from a file object (multipart for
+    large files) rather than holding the whole PDF in memory.
     Path: specs/{user_id}/{job_id}/{spec_id}.pdf
     Returns the R2 key
     """
     client = get_r2_client()
     r2_key = f"specs/{user_id}/{job_id}/{spec_id}.pdf"
 
-    client.put_object(
-        Bucket=R2_BUCKET_NAME, Key=r2_key, Body=pdf_bytes, ContentType="application/pdf"
+    client.upload_fileobj(
+        pdf_file,
+        R2_BUCKET_NAME,
+        r2_key,
+        ExtraArgs={"ContentType": "application/pdf"},
+        Config=UPLOAD_TRANSFER_CONFIG,
     )
 
     return r2_key
@@ -62,59 +130,61 @@ def delete_pdf(r2_key: str) -> bool:
         return False
 
 
+# ═══════════════════════════════════════════════════════════════
+# ANALYSIS INTERMEDIATES
+# ═══════════════════════════════════════════════════════════════
+
+
+def upload_analysis_json(spec_id: str, division_code: str, data: bytes) -> str:
+    """
+    Upload intermediate analysis data (JSON bytes) to R2 storage
+    Path: analyses/{spec_id}/{division_code}/{timestamp}.json
+    Returns the R2 key
+    """
+    import time
+
+    client = get_r2_client()
+    r2_key = f"analyses/{spec_id}/{division_code}/{int(time.time() * 1000)}.json"
+
+    client.put_object(
+        Bucket=R2_BUCKET_NAME, Key=r2_key, Body=data, ContentType="application/json"
+    )
+
+    return r2_key
+
+
 # ═══════════════════════════════════════════════════════════════
 # SUBMITTAL FILE STORAGE
 # ═══════════════════════════════════════════════════════════════
 
 
-def upload_submittal_file(item_id: str, filename: str, file_bytes: bytes) -> str:
+def upload_submittal_file(item_id: str, filename: str, file_obj: BinaryIO) -> str:
     """
-    Upload a submittal file to R2 storage.
+    Upload a submittal file to R2 storage, streamed from a file object.
     Path: submittals/{item_id}/{timestamp}_{safe_filename}
     Returns the R2 key.
     Supports: PDF, Word, Excel, RTF, images, and other common file types.
     """
-    import os
     import re
     import time
 
     client = get_r2_client()
 
-    # MIME type mapping
-    mime_types = {
-        ".pdf": "application/pdf",
-        ".doc": "application/msword",
-        ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        ".xls": "application/vnd.ms-excel",
-        ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        ".rtf": "application/rtf",
-        ".txt": "text/plain",
-        ".csv": "text/csv",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".png": "image/png",
-        ".gif": "image/gif",
-        ".tif": "image/tiff",
-        ".tiff": "image/tiff",
-        ".bmp": "image/bmp",
-        ".ppt": "application/vnd.ms-powerpoint",
-        ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
-        ".odt": "application/vnd.oasis.opendocument.text",
-        ".ods": "application/vnd.oasis.opendocument.spreadsheet",
-        ".odp": "application/vnd.oasis.opendocument.presentation",
-    }
-
     # Get content type based on extension
     ext = os.path.splitext(filename.lower())[1]
-    content_type = mime_types.get(ext, "application/octet-stream")
+    content_type = SUBMITTAL_MIME_TYPES.get(ext, "application/octet-stream")
 
     # Generate safe filename
     timestamp = int(time.time() * 1000)
     safe_name = re.sub(r"[^a-zA-Z0-9.-]", "_", filename)
     r2_key = f"submittals/{item_id}/{timestamp}_{safe_name}"
 
-    client.put_object(
-        Bucket=R2_BUCKET_NAME, Key=r2_key, Body=file_bytes, ContentType=content_type
+    client.upload_fileobj(
+        file_obj,
+        R2_BUCKET_NAME,
+        r2_key,
+        ExtraArgs={"ContentType": content_type},
+        Config=UPLOAD_TRANSFER_CONFIG,
     )
 
     return r2_key
@@ -129,6 +199,27 @@ def download_submittal_file(r2_key: str) -> bytes:
     return response["Body"].read()
 
 
+def download_submittal_file_stream(r2_key: str) -> Tuple[Iterator[bytes], int]:
+    """
+    Open a submittal file in R2 for streaming.
+    Returns (chunk iterator, content length). The object is fetched here, so a
+    missing key raises before any response starts; the body is closed once
+    the iterator is exhausted or abandoned.
+    """
+    client = get_r2_client()
+
+    response = client.get_object(Bucket=R2_BUCKET_NAME, Key=r2_key)
+    body = response["Body"]
+
+    def chunks() -> Iterator[bytes]:
+        try:
+            yield from body.iter_chunks(DOWNLOAD_CHUNK_SIZE)
+        finally:
+            body.close()
+
+    return chunks(), response["ContentLength"]
+
+
 def delete_submittal_file(r2_key: str) -> bool:
     """Delete a submittal PDF from R2 storage"""
     client = get_r2_client()
@@ -0,0 +1,32 @@
+-- Migration: Add sections_with_content RPC for section-by-section analysis
+-- Concatenates page content per section inside Postgres so the API doesn't
+-- have to pull every page row and join them in Python.
+-- Page format matches the Python service: "--- Page N ---\n<content>", joined by blank lines.
+
+CREATE OR REPLACE FUNCTION sections_with_content(p_spec_id UUID, p_division_code VARCHAR)
+RETURNS TABLE (
+    section_number VARCHAR,
+    page_count INTEGER,
+    pages INTEGER[],
+    content TEXT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        sp.section_number,
+        COUNT(*)::INTEGER AS page_count,
+        ARRAY_AGG(sp.page_number ORDER BY sp.page_number) AS pages,
+        STRING_AGG(
+            '--- Page ' || sp.page_number || E' ---\n' || sp.content,
+            E'\n\n' ORDER BY sp.page_number
+        ) AS content
+    FROM spec_pages sp
+    WHERE sp.spec_id = p_spec_id
+      AND sp.division_code = p_division_code
+      AND sp.section_number IS NOT NULL
+    GROUP BY sp.section_number
+    ORDER BY sp.section_number COLLATE "C";
+$$;
+
+COMMENT ON FUNCTION sections_with_content(UUID, VARCHAR) IS 'Per-section page list and concatenated content for a division. Used by section-by-section analysis of large divisions.';
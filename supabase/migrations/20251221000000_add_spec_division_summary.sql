@@ -0,0 +1,8 @@
+-- Migration: Store precomputed division summary on specs
+-- Written once when parsing finishes so GET /spec/{id}/divisions doesn't have to
+-- aggregate every spec_pages row on each view. Rewritten on every re-parse.
+
+ALTER TABLE specs
+ADD COLUMN IF NOT EXISTS division_summary JSONB;
+
+COMMENT ON COLUMN specs.division_summary IS 'Per-division page counts, sections and page range, computed at parse time: [{division_code, page_count, sections, page_range}]. NULL for specs parsed before this column existed.';
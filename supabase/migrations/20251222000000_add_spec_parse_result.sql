@@ -0,0 +1,9 @@
+-- Migration: Store the parse response on specs
+-- POST /parse/{spec_id} returns this stored result for specs that are already
+-- 'ready' instead of re-downloading and re-parsing the PDF (pass ?force=true to
+-- re-parse). Rewritten on every parse.
+
+ALTER TABLE specs
+ADD COLUMN IF NOT EXISTS parse_result JSONB;
+
+COMMENT ON COLUMN specs.parse_result IS 'ParseResponse body from the last successful parse: {page_count, division_count, divisions, toc_found, classification_stats}. NULL for specs parsed before this column existed.';
@@ -0,0 +1,38 @@
+-- Migration: Add delete_job_cascade RPC
+-- Deletes a job and everything hanging off it in one transaction, replacing the
+-- API's ownership check + spec lookup + six separate DELETE round trips.
+-- Delete order matches the Python service (leaf tables, then specs, then jobs).
+
+CREATE OR REPLACE FUNCTION delete_job_cascade(p_job_id UUID, p_user_id UUID)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_spec_ids UUID[];
+BEGIN
+    -- Job must exist and belong to this user
+    PERFORM 1 FROM jobs WHERE id = p_job_id AND user_id = p_user_id;
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT COALESCE(ARRAY_AGG(id), '{}') INTO v_spec_ids
+    FROM specs
+    WHERE job_id = p_job_id;
+
+    DELETE FROM spec_analyses WHERE job_id = p_job_id;
+    DELETE FROM spec_pages WHERE spec_id = ANY(v_spec_ids);
+    DELETE FROM spec_divisions WHERE spec_id = ANY(v_spec_ids);  -- legacy
+    DELETE FROM spec_tiles WHERE spec_id = ANY(v_spec_ids);  -- legacy
+    DELETE FROM specs WHERE job_id = p_job_id;
+    DELETE FROM jobs WHERE id = p_job_id;
+
+    RETURN COALESCE(ARRAY_LENGTH(v_spec_ids, 1), 0);
+END;
+$$;
+
+-- Takes the owner as a parameter, so only the service role may call it
+REVOKE EXECUTE ON FUNCTION delete_job_cascade(UUID, UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION delete_job_cascade(UUID, UUID) TO service_role;
+
+COMMENT ON FUNCTION delete_job_cascade(UUID, UUID) IS 'Delete a job with its specs, pages, analyses and legacy divisions/tiles in one transaction. Returns the number of specs deleted, or NULL if the job does not exist or is not owned by p_user_id.';
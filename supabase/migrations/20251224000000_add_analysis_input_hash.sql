@@ -0,0 +1,14 @@
+-- Migration: Identify analyses by their inputs
+-- POST /analyze/{spec_id} hashes everything an analysis depends on (model,
+-- prompts, request options, page content). When a stored analysis has the
+-- same hash it is returned instead of re-running Gemini (?force=true re-runs).
+
+ALTER TABLE spec_analyses
+ADD COLUMN IF NOT EXISTS input_hash TEXT,
+ADD COLUMN IF NOT EXISTS cross_refs_included INTEGER;
+
+CREATE INDEX IF NOT EXISTS idx_spec_analyses_input_hash
+ON spec_analyses (spec_id, division_code, input_hash);
+
+COMMENT ON COLUMN spec_analyses.input_hash IS 'SHA-256 of the analysis inputs (model, prompts, options, page content). NULL for analyses stored before this column existed.';
+COMMENT ON COLUMN spec_analyses.cross_refs_included IS 'Related-section pages/sections included in the analysis, returned with cached results.';
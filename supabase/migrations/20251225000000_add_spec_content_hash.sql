@@ -0,0 +1,15 @@
+-- Migration: Identify uploaded PDFs by content
+-- POST /upload hashes the PDF; re-uploading the same file to the same job
+-- returns the existing spec (and its R2 object / parse results) instead of
+-- creating a duplicate that would be stored and parsed again.
+
+ALTER TABLE specs
+ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- Lookup index only, deliberately not UNIQUE: a re-upload while the first
+-- copy is still "processing" gets a fresh spec rather than joining the
+-- running parse, so two specs can share a hash.
+CREATE INDEX IF NOT EXISTS idx_specs_content_hash
+ON specs (user_id, job_id, content_hash);
+
+COMMENT ON COLUMN specs.content_hash IS 'SHA-256 of the uploaded PDF bytes. NULL for specs uploaded before this column existed.';